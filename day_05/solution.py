@@ -1,4 +1,5 @@
 from collections import defaultdict, deque
+from functools import cmp_to_key
 
 def parse_input(input_text):
     """
@@ -104,8 +105,85 @@ def reorder_update(update, rules):
             if in_degree[neighbor] == 0:
                 queue.append(neighbor)
 
+    # Pages left with a non-zero in-degree sit on a cycle and can never be placed
+    if len(sorted_update) < len(update):
+        raise ValueError(f"Update {update} cannot be ordered: its rules contain a cycle.")
+
     return sorted_update
 
+def build_precedence(rules):
+    """
+    Precomputes the "must precede" relation from the ordering rules, so that
+    checking whether X|Y applies is a single set lookup.
+
+    Args:
+    rules (list): A list of rules as tuples (X, Y).
+
+    Returns:
+    defaultdict: Maps each page X to the set of pages Y that must come after it.
+    """
+    precedence = defaultdict(set)
+    for x, y in rules:
+        precedence[x].add(y)
+    return precedence
+
+def is_order_consistent(update, precedence):
+    """
+    Checks that no page in the update is preceded by a page it must come before.
+
+    Args:
+    update (list): A list of page numbers in the update.
+    precedence (dict): The relation returned by build_precedence.
+
+    Returns:
+    bool: True if the update respects every applicable rule, otherwise False.
+    """
+    seen = set()
+    for page in update:
+        if not precedence[page].isdisjoint(seen):
+            return False
+        seen.add(page)
+    return True
+
+def reorder_update_sorted(update, precedence, rules=None):
+    """
+    Reorders an update by sorting it with a comparator backed by the
+    precomputed precedence relation, instead of rebuilding a graph per update.
+
+    The comparator is only a valid sort key when the rules restricted to this
+    update form a total order (which is what the puzzle input guarantees). The
+    sorted result is verified; if it does not hold, the update is handed to
+    Kahn's algorithm, which either finds an order or reports a cycle.
+
+    Args:
+    update (list): A list of page numbers in the update.
+    precedence (dict): The relation returned by build_precedence.
+    rules (list): Optional rules as tuples (X, Y), used for the fallback.
+                  Rebuilt from precedence (restricted to this update) when omitted.
+
+    Returns:
+    list: The correctly-ordered update.
+
+    Raises:
+    ValueError: If the rules restricted to this update contain a cycle.
+    """
+    def compare(a, b):
+        if b in precedence[a]:
+            return -1  # a|b: a goes first
+        if a in precedence[b]:
+            return 1  # b|a: b goes first
+        return 0
+
+    sorted_update = sorted(update, key=cmp_to_key(compare))
+    if is_order_consistent(sorted_update, precedence):
+        return sorted_update
+
+    # Partial or cyclic relation: the comparator was not a strict ordering
+    if rules is None:
+        update_set = set(update)
+        rules = [(x, y) for x in update for y in precedence[x] if y in update_set]
+    return reorder_update(update, rules)
+
 def process_part_two(input_text):
     """
     Processes the puzzle to find the sum of middle pages from fixed updates.
@@ -118,17 +196,245 @@ def process_part_two(input_text):
     """
     # Parse input
     rules, updates = parse_input(input_text)
+    precedence = build_precedence(rules)
+    precedence_bits = build_precedence_bits(precedence)
 
     # Initialize the sum of middle pages
     middle_page_sum = 0
 
     for update in updates:
         if not is_update_valid(update, rules):  # Identify invalid updates
-            corrected_update = reorder_update(update, rules)  # Reorder it
-            middle_page_sum += find_middle_page(corrected_update)  # Add middle page
+            # Only the middle page of the corrected order is needed
+            middle_page_sum += select_middle_page(update, precedence, precedence_bits)
     
     return middle_page_sum
 
+def build_precedence_bits(precedence):
+    """
+    Packs the precedence relation into integer bitsets, one per page, with
+    bit Y set in the entry for page X when X must come before Y.
+
+    Args:
+    precedence (dict): The relation returned by build_precedence.
+
+    Returns:
+    defaultdict: Maps each page to the bitset of pages that must come after it.
+    """
+    precedence_bits = defaultdict(int)
+    for x, ys in precedence.items():
+        for y in ys:
+            precedence_bits[x] |= 1 << y
+    return precedence_bits
+
+def select_middle_page(update, precedence, precedence_bits):
+    """
+    Finds the middle page of the corrected update without building the order.
+
+    When the rules restricted to the update form a total order, the page with
+    exactly len(update) // 2 in-update predecessors is the middle one, i.e. the
+    page with len(update) - 1 - len(update) // 2 in-update successors. Successor
+    counts are bitset popcounts. The relation is confirmed total by checking that
+    every page's successors are exactly the pages with fewer successors; if not,
+    this falls back to the full sort.
+
+    Args:
+    update (list): A list of page numbers in the update.
+    precedence (dict): The relation returned by build_precedence.
+    precedence_bits (dict): The bitsets returned by build_precedence_bits.
+
+    Returns:
+    int: The middle page number of the correctly-ordered update.
+    """
+    n = len(update)
+    update_mask = 0
+    for page in update:
+        update_mask |= 1 << page
+
+    # by_count[k] is the page with exactly k successors inside the update
+    by_count = [None] * n
+    successor_masks = {}
+    for page in update:
+        successors = precedence_bits[page] & update_mask
+        count = successors.bit_count()
+        if count >= n or by_count[count] is not None:
+            return find_middle_page(reorder_update_sorted(update, precedence))
+        by_count[count] = page
+        successor_masks[page] = successors
+
+    # Total order check: each page must precede exactly the pages ranked after it
+    below = 0
+    for page in by_count:
+        if successor_masks[page] != below:
+            return find_middle_page(reorder_update_sorted(update, precedence))
+        below |= 1 << page
+
+    return by_count[n - 1 - n // 2]
+
+def build_precedence_matrix(rules, transitive=False, max_page=0):
+    """
+    Builds a dense N x N boolean "must precede" matrix from the rules, where
+    matrix[x, y] is True when page x must come before page y.
+
+    An extra all-False row and column is appended at index N to act as padding
+    for updates of different lengths.
+
+    Note: the puzzle only applies rules directly, and the full rule set may be
+    cyclic, so the transitive closure is opt-in and changes the semantics.
+
+    Args:
+    rules (list): A list of rules as tuples (X, Y).
+    transitive (bool): If True, close the relation transitively.
+    max_page (int): The largest page that will be looked up, e.g. the largest
+        page in the updates; pages beyond the rules get all-False rows.
+
+    Returns:
+    numpy.ndarray: A (N + 1) x (N + 1) boolean matrix; N is the padding index.
+    """
+    import numpy as np
+
+    size = max([max_page] + [max(x, y) for x, y in rules]) + 1
+    matrix = np.zeros((size + 1, size + 1), dtype=bool)
+    if rules:
+        xs, ys = np.array(rules, dtype=np.intp).T
+        matrix[xs, ys] = True
+
+    if transitive:
+        # Warshall's algorithm, one vectorized outer product per intermediate page
+        for k in range(size):
+            matrix |= matrix[:, k, None] & matrix[None, k, :]
+
+    return matrix
+
+def pack_updates(updates, pad):
+    """
+    Packs updates into a padded 2D array so the whole batch can be indexed at once.
+
+    Args:
+    updates (list): A list of updates (lists of page numbers).
+    pad (int): The page index used to fill the unused tail of shorter updates.
+
+    Returns:
+    tuple: The (updates x max_length) page array and the array of update lengths.
+    """
+    import numpy as np
+
+    lengths = np.array([len(update) for update in updates], dtype=np.intp)
+    packed = np.full((len(updates), lengths.max()), pad, dtype=np.intp)
+    for index, update in enumerate(updates):
+        packed[index, :len(update)] = update
+    return packed, lengths
+
+def validate_updates_vectorized(packed, matrix):
+    """
+    Checks every update in the batch at once: an update is invalid when some
+    later page i must precede an earlier page j, i.e. matrix[update[i], update[j]]
+    for i > j. Padding maps to the all-False row/column and never fails.
+
+    Args:
+    packed (numpy.ndarray): The page array returned by pack_updates.
+    matrix (numpy.ndarray): The matrix returned by build_precedence_matrix.
+
+    Returns:
+    numpy.ndarray: A boolean array, True for each valid update.
+    """
+    import numpy as np
+
+    later, earlier = np.tril_indices(packed.shape[1], k=-1)
+    violations = matrix[packed[:, later], packed[:, earlier]]
+    return ~violations.any(axis=1)
+
+def process_part_one_vectorized(input_text, transitive=False):
+    """
+    Processes Part 1 with the dense precedence matrix, validating all updates
+    in a handful of NumPy operations instead of a Python loop per rule per update.
+
+    Args:
+    input_text (str): The raw puzzle input as a string.
+    transitive (bool): If True, validate against the transitively closed rules.
+
+    Returns:
+    int: The sum of middle pages from valid updates.
+    """
+    import numpy as np
+
+    rules, updates = parse_input(input_text)
+    if not updates:
+        return 0
+    max_page = max(max(update) for update in updates)
+    matrix = build_precedence_matrix(rules, transitive, max_page)
+    packed, lengths = pack_updates(updates, pad=matrix.shape[0] - 1)
+
+    valid = validate_updates_vectorized(packed, matrix)
+    middle_pages = packed[np.arange(len(updates)), lengths // 2]
+    return int(middle_pages[valid].sum())
+
+class PrintQueue:
+    """
+    Keeps the Part 1 and Part 2 sums up to date while ordering rules are
+    added or removed, re-validating only the updates a rule change can affect.
+
+    An inverted index maps each page to the updates containing it, so a change
+    to rule X|Y touches only the updates that contain both X and Y.
+    """
+    def __init__(self, rules, updates):
+        self.rules = set(rules)
+        self.precedence = build_precedence(self.rules)
+        self.precedence_bits = build_precedence_bits(self.precedence)
+        self.updates = updates
+        self.page_index = defaultdict(set)  # {page: {update_index, ...}}
+        self.valid_middle = [0] * len(updates)  # Part 1 contribution per update
+        self.fixed_middle = [0] * len(updates)  # Part 2 contribution per update
+        self.part_one_sum = 0
+        self.part_two_sum = 0
+
+        for index, update in enumerate(updates):
+            for page in update:
+                self.page_index[page].add(index)
+            self._evaluate(index)
+
+    def _evaluate(self, index):
+        """
+        Recomputes one update's contributions and applies the difference to the sums.
+        Updates whose restricted rules contain a cycle contribute nothing to Part 2.
+        """
+        update = self.updates[index]
+        valid_middle, fixed_middle = 0, 0
+        if is_order_consistent(update, self.precedence):
+            valid_middle = find_middle_page(update)
+        else:
+            try:
+                fixed_middle = select_middle_page(update, self.precedence, self.precedence_bits)
+            except ValueError:
+                pass
+
+        self.part_one_sum += valid_middle - self.valid_middle[index]
+        self.part_two_sum += fixed_middle - self.fixed_middle[index]
+        self.valid_middle[index] = valid_middle
+        self.fixed_middle[index] = fixed_middle
+
+    def _affected_updates(self, x, y):
+        return self.page_index.get(x, set()) & self.page_index.get(y, set())
+
+    def add_rule(self, x, y):
+        """Adds rule X|Y and re-evaluates the updates containing both pages."""
+        if (x, y) in self.rules:
+            return
+        self.rules.add((x, y))
+        self.precedence[x].add(y)
+        self.precedence_bits[x] |= 1 << y
+        for index in self._affected_updates(x, y):
+            self._evaluate(index)
+
+    def remove_rule(self, x, y):
+        """Removes rule X|Y and re-evaluates the updates containing both pages."""
+        if (x, y) not in self.rules:
+            return
+        self.rules.discard((x, y))
+        self.precedence[x].discard(y)
+        self.precedence_bits[x] &= ~(1 << y)
+        for index in self._affected_updates(x, y):
+            self._evaluate(index)
+
 def main():
     """
     Main function to handle file input and execute the puzzle logic for both parts.
@@ -184,11 +490,31 @@ def testcase():
     print("\n--- Example Test Case ---")
     print("Processing Part 1 for example input...")
     example_part_one_result = process_part_one(example_input)
-    print(f"Part 1 Example Result (expected 137): {example_part_one_result}")
+    print(f"Part 1 Example Result (expected 143): {example_part_one_result}")
 
     print("Processing Part 2 for example input...")
     example_part_two_result = process_part_two(example_input)
     print(f"Part 2 Example Result (expected 123): {example_part_two_result}")
+
+    print("Processing Part 1 for example input with the precedence matrix...")
+    example_vectorized_result = process_part_one_vectorized(example_input)
+    print(f"Part 1 Vectorized Example Result (expected 143): {example_vectorized_result}")
+
+    print("Checking incremental sums after a rule change...")
+    queue = PrintQueue(*parse_input(example_input))
+    queue.remove_rule(97, 75)
+    queue.add_rule(75, 97)
+    edited_input = example_input.replace("97|75", "75|97")
+    print(f"Incremental sums: {(queue.part_one_sum, queue.part_two_sum)}, "
+          f"full recompute: {(process_part_one(edited_input), process_part_two(edited_input))}")
+
+    print("Checking that cyclic rules are reported as unorderable...")
+    cyclic_rules = [(1, 2), (2, 3), (3, 1)]
+    try:
+        reorder_update_sorted([3, 2, 1], build_precedence(cyclic_rules), cyclic_rules)
+        print("Cyclic update was ordered (expected ValueError)")
+    except ValueError as error:
+        print(f"Cyclic update rejected as expected: {error}")
     print("--- End of Example Test Case ---\n")
 
 # Entry point for the script
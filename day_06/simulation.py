@@ -1,7 +1,22 @@
+import argparse
 import os
+import subprocess
+import tempfile
 import time
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
 import matplotlib.animation as animation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulation.mp4")
+
+# Colormap index per grid symbol: empty, visited, obstacle, guard
+CELL_CODES = {".": 0, "X": 1, "#": 2, "^": 3, ">": 3, "v": 3, "<": 3}
+CELL_CMAP = ListedColormap(["white", "gray", "black", "red"])
 
 
 def read_map(file_path):
@@ -15,77 +30,131 @@ def read_map(file_path):
         return [list(line.strip()) for line in file]
 
 
-def print_grid(grid, frames):
+class BlitFFMpegWriter(animation.FFMpegWriter):
     """
-    Visualizes the current state of the grid using matplotlib and saves the animation.
-
-    :param grid: A 2D list representing the grid.
-    :param frames: A list of 2D lists representing the grid at each step.
+    FFMpegWriter that pipes the canvas' current RGBA buffer to ffmpeg, instead
+    of redrawing the whole figure through savefig on every grabbed frame.
+    The caller keeps the buffer up to date by blitting what changed.
     """
-    fig, ax = plt.subplots()
-    ax.set_xticks([])
-    ax.set_yticks([])
 
-    def update(frame):
-        ax.clear()
-        ax.set_xticks([])
-        ax.set_yticks([])
-        numeric_frame = [
-            [
-                1 if cell == "X" else 2 if cell == "#" else 3 if cell in "^>v<" else 0
-                for cell in row
-            ]
-            for row in frame
-        ]
-        cmap = plt.cm.colors.ListedColormap(["white", "gray", "black", "red"])
-        ax.imshow(numeric_frame, cmap=cmap)
-
-    ani = animation.FuncAnimation(fig, update, frames=frames, repeat=False)
-    ani.save(
-        "/home/jatin/git/advent-of-code-2024/day_6/simulation.mp4",
-        writer="ffmpeg",
-        fps=60,
-        dpi=300,
-    )
-    plt.close(fig)
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frame_format = "rgba"
+
+    def grab_frame(self, **savefig_kwargs):
+        self._proc.stdin.write(self.fig.canvas.buffer_rgba())
 
 
-def simulate_guard_patrol(grid):
+def grid_to_codes(grid):
     """
-    Simulates the guard's patrol based on the given rules and prints the simulation.
+    Converts a grid of symbols into a uint8 array of colormap indices.
 
     :param grid: A 2D list representing the grid.
-    :return: The number of distinct positions visited by the guard.
+    :return: A 2D uint8 NumPy array.
     """
-    directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]  # (row_delta, col_delta)
-    direction_symbols = "^>v<"  # Representing the guard's facing direction
-    direction_index = 0  # Start facing "up" (index 0 in directions)
+    return np.array([[CELL_CODES[cell] for cell in row] for row in grid], dtype=np.uint8)
 
-    guard_row, guard_col = None, None
-    for r, row in enumerate(grid):
-        for c, cell in enumerate(row):
-            if cell in direction_symbols:
-                guard_row, guard_col = r, c
-                direction_index = direction_symbols.index(cell)
-                grid[r][c] = "X"  # Mark starting position as visited
-                break
-        if guard_row is not None:
-            break
 
-    if guard_row is None or guard_col is None:
-        raise ValueError("Guard's starting position not found in the grid.")
+def print_grid(
+    grid,
+    deltas,
+    output_path=OUTPUT_PATH,
+    stride=1,
+    skip=0,
+    dpi=300,
+    figsize=(6.4, 4.8),
+    first_step=0,
+    render_initial=True,
+    render_final=True,
+):
+    """
+    Visualizes the patrol using matplotlib and streams the frames into the
+    ffmpeg writer as they are produced, so only one grid is kept in memory.
 
-    visited_positions = set()
-    visited_positions.add((guard_row, guard_col))
+    The figure is rendered once, with a single persistent imshow artist fed
+    by a uint8 buffer of colormap indices. After that, each delta updates the
+    buffer in place and blits the changed cells straight into the canvas
+    pixels with the precomputed palette, so no frame is ever fully redrawn.
+
+    :param grid: A 2D list representing the grid before the first step.
+    :param deltas: An iterable of per-step changes, each a list of (row, col, symbol).
+    :param output_path: Path of the video file to write.
+    :param stride: Render only every `stride`-th step.
+    :param skip: Number of initial steps to leave out of the video.
+    :param dpi: Output resolution in pixels per inch.
+    :param figsize: Output size in inches (width, height).
+    :param first_step: Global step number of `grid`, when rendering one segment of a patrol.
+    :param render_initial: Whether `grid` itself may be rendered as the first frame.
+    :param render_final: Whether to always end on the final state.
+    """
+    buffer = grid_to_codes(grid)
+    rows, cols = buffer.shape
 
-    frames = []  # Initialize frames list
-    frames.append([row[:] for row in grid])  # Add initial state to frames
+    # Even pixel dimensions, as required by the h264 encoder
+    width, height = 2 * round(figsize[0] * dpi / 2), 2 * round(figsize[1] * dpi / 2)
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_axis_off()
+    image = ax.imshow(
+        buffer,
+        cmap=CELL_CMAP,
+        vmin=0,
+        vmax=len(CELL_CMAP.colors) - 1,
+        interpolation="nearest",
+    )
+    canvas.draw()
+
+    # Canvas pixels (a view, top row first) and the pixel edges of every cell
+    pixels = np.asarray(canvas.buffer_rgba())
+    palette = CELL_CMAP(np.arange(len(CELL_CMAP.colors)), bytes=True)
+    x_edges = ax.transData.transform(np.column_stack([np.arange(cols + 1) - 0.5, np.zeros(cols + 1)]))[:, 0]
+    y_edges = ax.transData.transform(np.column_stack([np.zeros(rows + 1), np.arange(rows + 1) - 0.5]))[:, 1]
+    x_edges = np.clip(np.rint(x_edges), 0, width).astype(int)
+    y_edges = np.clip(height - np.rint(y_edges), 0, height).astype(int)
+
+    def blit_cell(row, col, code):
+        buffer[row, col] = code
+        pixels[y_edges[row]:y_edges[row + 1], x_edges[col]:x_edges[col + 1]] = palette[code]
+
+    def is_frame(step):
+        return step >= skip and (step - skip) % stride == 0
+
+    writer = BlitFFMpegWriter(fps=60)
+    with writer.saving(fig, output_path, dpi=dpi):
+        step = first_step
+        if render_initial and is_frame(step):
+            writer.grab_frame()
+        for step, delta in enumerate(deltas, start=first_step + 1):
+            for row, col, symbol in delta:
+                blit_cell(row, col, CELL_CODES[symbol])
+            if is_frame(step):
+                writer.grab_frame()
+        if render_final and not is_frame(step):
+            writer.grab_frame()  # Always end on the final state
+
+    image.set_data(buffer)  # Keep the artist in sync for any later full redraw
+
+
+def patrol_deltas(grid, guard_row, guard_col, direction_index, log=None):
+    """
+    Runs the guard's patrol and yields only the cells that change at each step.
+
+    :param grid: A 2D list representing the grid (not modified).
+    :param guard_row: The guard's starting row.
+    :param guard_col: The guard's starting column.
+    :param direction_index: The guard's starting direction index.
+    :param log: Optional sink called with a message for every step (e.g. print);
+                steps are not logged by default.
+    :return: A generator of per-step changes, each a list of (row, col, symbol).
+    """
+    directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]  # (row_delta, col_delta)
+    direction_symbols = "^>v<"  # Representing the guard's facing direction
 
     while True:
-        # Print current state
-        print(
-            f"Guard at ({guard_row}, {guard_col}) facing {direction_symbols[direction_index]}"
-        )
+        # Log current state
+        if log is not None:
+            log(f"Guard at ({guard_row}, {guard_col}) facing {direction_symbols[direction_index]}")
 
         # Compute next position based on the current direction
         delta_row, delta_col = directions[direction_index]
@@ -95,44 +164,200 @@ def simulate_guard_patrol(grid):
         # Check if next position is within bounds
         if 0 <= next_row < len(grid) and 0 <= next_col < len(grid[0]):
             if grid[next_row][next_col] != "#":
-                print(f"Moving to ({next_row}, {next_col})")
-                # Move forward
-                grid[guard_row][guard_col] = "X"  # Mark current position as visited
+                if log is not None:
+                    log(f"Moving to ({next_row}, {next_col})")
+                # Move forward, marking the current position as visited
+                yield [
+                    (guard_row, guard_col, "X"),
+                    (next_row, next_col, direction_symbols[direction_index]),
+                ]
                 guard_row, guard_col = next_row, next_col
-                visited_positions.add((guard_row, guard_col))
-                grid[guard_row][guard_col] = direction_symbols[
-                    direction_index
-                ]  # Update guard's symbol
             else:
-                print(f"Obstacle at ({next_row}, {next_col}), turning right")
+                if log is not None:
+                    log(f"Obstacle at ({next_row}, {next_col}), turning right")
                 # Obstacle detected, turn right 90 degrees
                 direction_index = (direction_index + 1) % 4
-                grid[guard_row][guard_col] = direction_symbols[
-                    direction_index
-                ]  # Update guard's symbol
+                yield [(guard_row, guard_col, direction_symbols[direction_index])]
         else:
-            print(f"Guard is leaving the mapped area from ({guard_row}, {guard_col})")
-            # Guard leaves the mapped area
-            grid[guard_row][guard_col] = "X"  # Mark last position as visited
-            frames.append([row[:] for row in grid])
-            break  # Exit the simulation loop
+            if log is not None:
+                log(f"Guard is leaving the mapped area from ({guard_row}, {guard_col})")
+            # Guard leaves the mapped area, marking the last position as visited
+            yield [(guard_row, guard_col, "X")]
+            return
+
+
+def find_guard(grid):
+    """
+    Finds the guard's starting position and facing direction.
+
+    :param grid: A 2D list representing the grid.
+    :return: A tuple (row, col, direction_index).
+    """
+    direction_symbols = "^>v<"  # Representing the guard's facing direction
+
+    for r, row in enumerate(grid):
+        for c, cell in enumerate(row):
+            if cell in direction_symbols:
+                return r, c, direction_symbols.index(cell)
+
+    raise ValueError("Guard's starting position not found in the grid.")
 
-        # Add current state to frames
-        frames.append([row[:] for row in grid])
+
+def simulate_guard_patrol(grid, output_path=OUTPUT_PATH, stride=1, skip=0, dpi=300, figsize=(6.4, 4.8), log=print):
+    """
+    Simulates the guard's patrol based on the given rules and renders the simulation.
+    Only the cells changed at each step are recorded, and frames are encoded
+    as the patrol runs, so memory does not grow with the number of steps.
+
+    :param grid: A 2D list representing the grid.
+    :param output_path: Path of the video file to write.
+    :param stride: Render only every `stride`-th step.
+    :param skip: Number of initial steps to leave out of the video.
+    :param dpi: Output resolution in pixels per inch.
+    :param figsize: Output size in inches (width, height).
+    :param log: Sink for the per-step log messages, or None to silence them.
+    :return: The number of distinct positions visited by the guard.
+    """
+    guard_row, guard_col, direction_index = find_guard(grid)
+
+    visited_positions = set()
+    visited_positions.add((guard_row, guard_col))
+
+    def recorded(deltas):
+        # Track visited cells as the deltas stream through to the renderer
+        for delta in deltas:
+            visited_positions.update((row, col) for row, col, _ in delta)
+            yield delta
+
+    deltas = patrol_deltas(grid, guard_row, guard_col, direction_index, log)
 
     # Generate the animation
-    print_grid(grid, frames)
+    print_grid(grid, recorded(deltas), output_path, stride, skip, dpi, figsize)
+
+    return len(visited_positions)
+
+
+def _render_segment(kwargs):
+    """Process-pool task: renders one segment of the patrol to its own file."""
+    print_grid(**kwargs)
+    return kwargs["output_path"]
+
+
+def render_patrol_parallel(
+    grid,
+    output_path=OUTPUT_PATH,
+    stride=1,
+    skip=0,
+    dpi=300,
+    figsize=(6.4, 4.8),
+    segments=None,
+    workers=None,
+    log=None,
+):
+    """
+    Non-interactive renderer for batch jobs: records the patrol as deltas,
+    splits the frames into time segments, renders the segments in a process
+    pool to separate files and concatenates them losslessly with ffmpeg.
+
+    :param grid: A 2D list representing the grid.
+    :param output_path: Path of the final video file.
+    :param stride: Render only every `stride`-th step.
+    :param skip: Number of initial steps to leave out of the video.
+    :param dpi: Output resolution in pixels per inch.
+    :param figsize: Output size in inches (width, height).
+    :param segments: Number of segments to render (defaults to the CPU count).
+    :param workers: Number of worker processes (defaults to the CPU count).
+    :param log: Optional sink for the per-step log messages; silent by default.
+    :return: The number of distinct positions visited by the guard.
+    """
+    guard_row, guard_col, direction_index = find_guard(grid)
+    deltas = list(patrol_deltas(grid, guard_row, guard_col, direction_index, log))
+    visited_positions = {(guard_row, guard_col)}
+    for delta in deltas:
+        visited_positions.update((row, col) for row, col, _ in delta)
+
+    # Steps that become frames; each segment gets a contiguous run of them
+    total_steps = len(deltas)
+    frame_steps = [step for step in range(total_steps + 1) if step >= skip and (step - skip) % stride == 0]
+    if not frame_steps or frame_steps[-1] != total_steps:
+        frame_steps.append(total_steps)  # Always end on the final state
+    segments = max(1, min(segments or os.cpu_count() or 1, len(frame_steps)))
+    chunk = -(-len(frame_steps) // segments)
+    boundaries = [frame_steps[min(i + chunk, len(frame_steps)) - 1] for i in range(0, len(frame_steps), chunk)]
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as work_dir:
+        tasks = []
+        frame = [row[:] for row in grid]
+        first_step = 0
+        for index, last_step in enumerate(boundaries):
+            tasks.append(
+                dict(
+                    grid=[row[:] for row in frame],
+                    deltas=deltas[first_step:last_step],
+                    output_path=os.path.join(work_dir, f"segment_{index:04d}.mp4"),
+                    stride=stride,
+                    skip=skip,
+                    dpi=dpi,
+                    figsize=figsize,
+                    first_step=first_step,
+                    render_initial=index == 0,
+                    render_final=index == len(boundaries) - 1,
+                )
+            )
+            # Advance the working grid to the start of the next segment
+            for delta in deltas[first_step:last_step]:
+                for row, col, symbol in delta:
+                    frame[row][col] = symbol
+            first_step = last_step
+
+        with ProcessPoolExecutor(workers) as pool:
+            segment_paths = list(pool.map(_render_segment, tasks))
+
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, "w") as file:
+            file.writelines(f"file '{path}'\n" for path in segment_paths)
+        subprocess.run(
+            [
+                matplotlib.rcParams["animation.ffmpeg_path"],
+                "-y", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", list_path,
+                "-c", "copy", output_path,
+            ],
+            check=True,
+        )
 
     return len(visited_positions)
 
 
 if __name__ == "__main__":
-    input_file = "input.txt"
-    lab_map = read_map(input_file)
+    parser = argparse.ArgumentParser(description="Render the Day 6 guard patrol to a video.")
+    parser.add_argument("input_file", nargs="?", default="input.txt")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Path of the video file to write.")
+    parser.add_argument("--dpi", type=int, default=300, help="Output resolution in pixels per inch.")
+    parser.add_argument("--size", type=float, nargs=2, default=(6.4, 4.8), metavar=("WIDTH", "HEIGHT"),
+                        help="Output size in inches.")
+    parser.add_argument("--stride", type=int, default=1, help="Render only every n-th step.")
+    parser.add_argument("--skip", type=int, default=0, help="Number of initial steps to leave out.")
+    parser.add_argument("--headless", action="store_true",
+                        help="Render segments in parallel and exit without waiting for input.")
+    parser.add_argument("--segments", type=int, default=None, help="Number of segments in headless mode.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes in headless mode.")
+    parser.add_argument("--verbose", action="store_true", help="Log every patrol step in headless mode.")
+    args = parser.parse_args()
+
+    lab_map = read_map(args.input_file)
 
-    distinct_positions = simulate_guard_patrol(lab_map)
+    if args.headless:
+        distinct_positions = render_patrol_parallel(
+            lab_map, args.output, args.stride, args.skip, args.dpi, tuple(args.size), args.segments, args.workers,
+            log=print if args.verbose else None,
+        )
+    else:
+        distinct_positions = simulate_guard_patrol(
+            lab_map, args.output, args.stride, args.skip, args.dpi, tuple(args.size)
+        )
 
-    # Wait for user input before displaying the result
-    input("\nSimulation complete! Press Enter to see the final answer...")
+        # Wait for user input before displaying the result
+        input("\nSimulation complete! Press Enter to see the final answer...")
 
     print(f"\nNumber of distinct positions visited: {distinct_positions}")
@@ -1,5 +1,13 @@
 # Advent of Code 2024 - Day 6: Guard Gallivant
 
+import os
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
 def parse_input(file_path):
     """
     Reads the map from the input file and returns it as a list of strings.
@@ -15,12 +23,17 @@ def parse_input(file_path):
         return [line.strip() for line in f]
 
 
-def simulate_guard_patrol(map_data):
+def simulate_guard_patrol(map_data, trace=None, stamps=None):
     """
     Simulates the guard's patrol based on the rules provided in Part 1.
 
     Args:
         map_data (list[str]): The lab map as a list of strings.
+        trace (callable): Optional sink called as trace(row, col, direction)
+                          for the starting state and after every move or turn,
+                          e.g. print_trace or a TraceRecorder. Step-level
+                          tracing is skipped entirely when no sink is attached.
+        stamps (StateStamps): Optional reusable visited buffer for this map size.
 
     Returns:
         int: The number of distinct positions visited by the guard.
@@ -28,7 +41,6 @@ def simulate_guard_patrol(map_data):
     # Directions: up, right, down, left (clockwise order)
     directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]  # (row_offset, col_offset)
     current_direction = 0  # Start facing up
-    visited_positions = set()
 
     # Find initial guard position
     for r, row in enumerate(map_data):
@@ -38,10 +50,19 @@ def simulate_guard_patrol(map_data):
 
     print(f"Starting guard position: {guard_position}")
 
+    rows, cols = len(map_data), len(map_data[0])
+
+    # Visited cells are stamped in the first rows * cols slots of the buffer
+    if stamps is None:
+        stamps = StateStamps(rows, cols)
+    visited, generation = stamps.stamps, stamps.new_generation()
+
     # Add starting position to visited positions
-    visited_positions.add(guard_position)
+    visited[guard_position[0] * cols + guard_position[1]] = generation
+    visited_count = 1
 
-    rows, cols = len(map_data), len(map_data[0])
+    if trace is not None:
+        trace(guard_position[0], guard_position[1], current_direction)
 
     while True:
         # Calculate next position based on current direction
@@ -57,83 +78,995 @@ def simulate_guard_patrol(map_data):
         if map_data[next_row][next_col] == '#':
             # Turn right (90 degrees clockwise)
             current_direction = (current_direction + 1) % 4
-            print(f"Obstacle ahead. Turning right. New direction index: {current_direction}")
         else:
             # Move forward
             guard_position = (next_row, next_col)
-            visited_positions.add(guard_position)
-            print(f"Guard moved to: {guard_position}")
+            cell = next_row * cols + next_col
+            if visited[cell] != generation:
+                visited[cell] = generation
+                visited_count += 1
 
-    return len(visited_positions)
+        if trace is not None:
+            trace(guard_position[0], guard_position[1], current_direction)
 
+    return visited_count
 
-def find_loop_positions(map_data):
+
+def print_trace(row, col, direction):
+    """Trace sink that logs every guard step, for opt-in step-level debugging."""
+    print(f"Guard at ({row}, {col}) facing {'^>v<'[direction]}")
+
+
+class TraceRecorder:
     """
-    Finds all possible positions where a new obstruction can be placed to trap
-    the guard in a loop.
+    Trace sink that records guard steps compactly, packing each step's
+    position and direction into a single int of an array:
+    (row * cols + col) * 4 + direction.
+
+    Recorded traces can be saved to disk and replayed later, e.g. by the
+    visualizer or debugging tools.
+    """
+    def __init__(self, cols):
+        self.cols = cols
+        self.steps = array('q')
+
+    def __call__(self, row, col, direction):
+        self.steps.append((row * self.cols + col) << 2 | direction)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def replay(self):
+        """Yields the recorded (row, col, direction) steps in order."""
+        cols = self.cols
+        for packed in self.steps:
+            row, col = divmod(packed >> 2, cols)
+            yield row, col, packed & 3
+
+    def save(self, file_path):
+        """Writes the trace as raw int64 values, with the column count first."""
+        with open(file_path, 'wb') as f:
+            array('q', [self.cols]).tofile(f)
+            self.steps.tofile(f)
+
+    @classmethod
+    def load(cls, file_path):
+        """Reads a trace written by save."""
+        data = array('q')
+        with open(file_path, 'rb') as f:
+            data.frombytes(f.read())
+        recorder = cls(data[0])
+        recorder.steps = data[1:]
+        return recorder
+
+
+# Directions: up, right, down, left (clockwise order)
+DIRECTIONS = [(-1, 0), (0, 1), (1, 0), (0, -1)]  # (row_offset, col_offset)
+
+
+def find_guard(map_data):
+    """
+    Finds the guard's starting position on the map.
 
     Args:
         map_data (list[str]): The lab map as a list of strings.
 
     Returns:
-        int: The number of valid positions where an obstruction can be placed.
+        tuple[int, int]: The (row, col) of the '^' cell.
+    """
+    for r, row in enumerate(map_data):
+        c = row.find('^')
+        if c != -1:
+            return (r, c)
+    raise ValueError("Guard's starting position not found in the map.")
+
+
+def build_jump_table(map_data):
+    """
+    Precomputes, for every (cell, direction), the cell where the guard stops
+    in front of the next obstacle, so a straight run costs a single lookup.
+
+    Cells are flattened to `row * cols + col`. The table is a flat array of
+    4 * rows * cols entries indexed by `direction * rows * cols + cell`; an
+    entry of -1 means the guard walks off the map in that direction.
+
+    Args:
+        map_data (list[str]): The lab map as a list of strings.
+
+    Returns:
+        array.array: The flat jump table.
+    """
+    rows, cols = len(map_data), len(map_data[0])
+    n = rows * cols
+    jump = array('i', [-1]) * (4 * n)
+
+    for c in range(cols):
+        # Up: the stop is the cell just below the closest obstacle above
+        stop = -1
+        for r in range(rows):
+            if map_data[r][c] == '#':
+                stop = (r + 1) * cols + c
+            else:
+                jump[r * cols + c] = stop
+        # Down: the stop is the cell just above the closest obstacle below
+        stop = -1
+        for r in range(rows - 1, -1, -1):
+            if map_data[r][c] == '#':
+                stop = (r - 1) * cols + c
+            else:
+                jump[2 * n + r * cols + c] = stop
+
+    for r in range(rows):
+        # Right: the stop is the cell just left of the closest obstacle
+        stop = -1
+        for c in range(cols - 1, -1, -1):
+            if map_data[r][c] == '#':
+                stop = r * cols + c - 1
+            else:
+                jump[n + r * cols + c] = stop
+        # Left: the stop is the cell just right of the closest obstacle
+        stop = -1
+        for c in range(cols):
+            if map_data[r][c] == '#':
+                stop = r * cols + c + 1
+            else:
+                jump[3 * n + r * cols + c] = stop
+
+    return jump
+
+
+def trace_first_visits(map_data, start):
+    """
+    Walks the guard's original patrol and records, for every cell it reaches
+    after the start, the guard state just before the first visit to that cell.
+
+    Args:
+        map_data (list[str]): The lab map as a list of strings.
+        start (tuple[int, int]): The guard's starting (row, col).
+
+    Returns:
+        tuple[dict[int, tuple[int, int]], bool]: Maps each flattened cell, in
+        path order, to the (flattened position, direction) the guard entered
+        it from; and whether the original patrol loops instead of exiting.
+    """
+    rows, cols = len(map_data), len(map_data[0])
+    row, col = start
+    direction = 0
+    first_visits = {}
+    turn_states = set()  # Stops the walk if the original patrol already loops
+
+    while True:
+        next_row = row + DIRECTIONS[direction][0]
+        next_col = col + DIRECTIONS[direction][1]
+        if not (0 <= next_row < rows and 0 <= next_col < cols):
+            return first_visits, False
+        if map_data[next_row][next_col] == '#':
+            if (row, col, direction) in turn_states:
+                return first_visits, True
+            turn_states.add((row, col, direction))
+            direction = (direction + 1) % 4
+            continue
+        cell = next_row * cols + next_col
+        if cell != start[0] * cols + start[1] and cell not in first_visits:
+            first_visits[cell] = (row * cols + col, direction)
+        row, col = next_row, next_col
+
+
+def off_path_cells(map_data, start, first_visits):
+    """
+    Lists the free cells the guard's original patrol never reaches.
+
+    An obstruction there leaves the patrol unchanged, so these cells only
+    matter when the original patrol already loops: then every one of them
+    traps the guard.
+
+    Args:
+        map_data (list[str]): The lab map as a list of strings.
+        start (tuple[int, int]): The guard's starting (row, col).
+        first_visits (dict): The visits returned by trace_first_visits.
+
+    Returns:
+        list[int]: The flattened cells, excluding obstacles and the start.
+    """
+    cols = len(map_data[0])
+    start_cell = start[0] * cols + start[1]
+    return [
+        row * cols + col
+        for row, line in enumerate(map_data)
+        for col, cell in enumerate(line)
+        if cell != '#' and row * cols + col != start_cell and row * cols + col not in first_visits
+    ]
+
+
+class StateStamps:
+    """
+    A preallocated rows x cols x 4 visited-state buffer that is never cleared.
+
+    Each simulation takes a new generation number, and a state counts as
+    visited only if its slot holds the current generation. Allocate one per
+    map size (or per worker) and reuse it across all trials.
+    """
+    def __init__(self, rows, cols):
+        self.size = 4 * rows * cols
+        self.stamps = array('I', bytes(4 * self.size))  # One uint32 per (direction, cell)
+        self.generation = 0
+
+    def new_generation(self):
+        """Starts a new simulation and returns its stamp value."""
+        self.generation += 1
+        if self.generation > 0xFFFFFFFF:
+            # Stamps wrapped around: clear once, in place, since callers may hold the array
+            self.stamps[:] = array('I', bytes(4 * self.size))
+            self.generation = 1
+        return self.generation
+
+
+def patched_stop(jump, n, cols, position, direction, obstruction):
     """
-    def simulate_with_obstruction(obstruction_position):
+    Looks up where the guard stops from `position` facing `direction`, using
+    the added obstruction instead of the jump table entry if it is hit first.
+
+    Args:
+        jump (array.array): The table returned by build_jump_table.
+        n (int): Number of cells in the map (rows * cols).
+        cols (int): Number of columns in the map.
+        position (int): The guard's flattened cell.
+        direction (int): The guard's direction index.
+        obstruction (int): The flattened cell where the obstruction is added.
+
+    Returns:
+        int: The flattened stop cell, or -1 if the guard leaves the map.
+    """
+    stop = jump[direction * n + position]
+    row, col = divmod(position, cols)
+    obstruction_row, obstruction_col = divmod(obstruction, cols)
+
+    # Use the added obstruction instead if it is hit before the stop (or the edge)
+    if direction == 0:
+        if obstruction_col == col and obstruction_row < row and (stop == -1 or obstruction_row >= stop // cols):
+            return obstruction + cols
+    elif direction == 1:
+        if obstruction_row == row and obstruction_col > col and (stop == -1 or obstruction_col <= stop % cols):
+            return obstruction - 1
+    elif direction == 2:
+        if obstruction_col == col and obstruction_row > row and (stop == -1 or obstruction_row <= stop // cols):
+            return obstruction - cols
+    elif obstruction_row == row and obstruction_col < col and (stop == -1 or obstruction_col >= stop % cols):
+        return obstruction + 1
+    return stop
+
+
+def simulate_with_obstruction(jump, rows, cols, position, direction, obstruction, trace=None, stamps=None):
+    """
+    Simulates the guard from a given state with one obstruction added, moving
+    from turn to turn with the jump table. The table entry is patched on the
+    fly whenever the added obstruction lies on the current straight run, so a
+    trial costs O(turns) instead of O(steps).
+
+    Args:
+        jump (array.array): The table returned by build_jump_table.
+        rows (int): Number of rows in the map.
+        cols (int): Number of columns in the map.
+        position (int): The guard's flattened starting cell.
+        direction (int): The guard's starting direction index.
+        obstruction (int): The flattened cell where the obstruction is added.
+        trace (callable): Optional sink called as trace(row, col, direction)
+                          at every turn, e.g. print_trace or a TraceRecorder.
+        stamps (StateStamps): Optional reusable visited-state buffer; pass one
+                              shared across trials to avoid per-trial allocation.
+
+    Returns:
+        bool: True if the guard gets stuck in a loop; False otherwise.
+    """
+    n = rows * cols
+    if stamps is None:
+        stamps = StateStamps(rows, cols)
+    visited_states, generation = stamps.stamps, stamps.new_generation()
+
+    while True:
+        stop = patched_stop(jump, n, cols, position, direction, obstruction)
+
+        if stop == -1:
+            return False  # Guard leaves the mapped area
+
+        if trace is not None:
+            trace(stop // cols, stop % cols, direction)
+
+        state = direction * n + stop
+        if visited_states[state] == generation:
+            return True  # Loop detected
+        visited_states[state] = generation
+
+        position = stop
+        direction = (direction + 1) % 4
+
+
+# Fates of a turn state in PatrolFates
+EXITS, CYCLES = 2, 3
+
+
+class PatrolFates:
+    """
+    Precomputed functional graph over every turn state of a map.
+
+    A turn state `direction * rows * cols + cell` is the guard standing on
+    `cell` about to walk in `direction`; it leads to exactly one next turn
+    state or off the map. Every state is labelled as exiting or cycling in
+    O(states) by an iterative colouring pass, together with the bounding box
+    of all cells its remaining patrol covers.
+
+    An added obstruction can only change states whose future patrol covers
+    it, so a query walks the modified graph only until it reaches a state
+    whose box excludes the obstruction, and then reuses the cached fate.
+    """
+    def __init__(self, map_data):
+        self.map_data = map_data
+        self.rows, self.cols = len(map_data), len(map_data[0])
+        self.n = self.rows * self.cols
+        self.jump = build_jump_table(map_data)
+        self.start = find_guard(map_data)
+        self.first_visits, self.loops = trace_first_visits(map_data, self.start)
+        self.stamps = StateStamps(self.rows, self.cols)
+        self._label_states()
+
+    def _run_box(self, state):
+        """Bounding box (min_row, max_row, min_col, max_col) of a state's straight run."""
+        direction, cell = divmod(state, self.n)
+        row, col = divmod(cell, self.cols)
+        stop = self.jump[state]
+        if stop == -1:
+            # The run ends on the map edge
+            stop_row, stop_col = ((0, col), (row, self.cols - 1), (self.rows - 1, col), (row, 0))[direction]
+        else:
+            stop_row, stop_col = divmod(stop, self.cols)
+        return min(row, stop_row), max(row, stop_row), min(col, stop_col), max(col, stop_col)
+
+    def _label_states(self):
+        n, jump = self.n, self.jump
+        self.fate = bytearray(4 * n)  # 0 = unvisited, 1 = on the current chain, EXITS or CYCLES
+        self.boxes = [None] * (4 * n)
+
+        def successor(state):
+            stop = jump[state]
+            return -1 if stop == -1 else ((state // n + 1) % 4) * n + stop
+
+        def merge(box, other):
+            return min(box[0], other[0]), max(box[1], other[1]), min(box[2], other[2]), max(box[3], other[3])
+
+        for first in range(4 * n):
+            if self.fate[first] or self.map_data[(first % n) // self.cols][first % self.cols] == '#':
+                continue
+
+            # Follow successors until reaching the exit, a labelled state or the chain itself
+            chain, chain_index = [], {}
+            state = first
+            while state != -1 and self.fate[state] == 0:
+                self.fate[state] = 1
+                chain_index[state] = len(chain)
+                chain.append(state)
+                state = successor(state)
+
+            if state != -1 and self.fate[state] == 1:
+                # The chain closed on itself: label the cycle with one shared box
+                cycle = chain[chain_index[state]:]
+                del chain[chain_index[state]:]
+                box = self._run_box(cycle[0])
+                for member in cycle[1:]:
+                    box = merge(box, self._run_box(member))
+                for member in cycle:
+                    self.fate[member] = CYCLES
+                    self.boxes[member] = box
+
+            # Unwind the tail: each state inherits its successor's fate
+            for member in reversed(chain):
+                following = successor(member)
+                if following == -1:
+                    self.fate[member] = EXITS
+                    self.boxes[member] = self._run_box(member)
+                else:
+                    self.fate[member] = self.fate[following]
+                    self.boxes[member] = merge(self._run_box(member), self.boxes[following])
+
+    def would_trap(self, row, col):
         """
-        Simulates the guard's movement with an obstruction added at a specific position.
-        
+        Checks whether an obstruction at (row, col) traps the guard in a loop.
+
         Args:
-            obstruction_position (tuple[int, int]): The position where an obstruction is added.
-        
+            row (int): Row of the added obstruction.
+            col (int): Column of the added obstruction.
+
         Returns:
             bool: True if the guard gets stuck in a loop; False otherwise.
         """
-        directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-        current_direction = 0
-
-        # Copy map data and add obstruction
-        modified_map = [list(row) for row in map_data]
-        modified_map[obstruction_position[0]][obstruction_position[1]] = '#'
+        obstruction = row * self.cols + col
+        if (row, col) == self.start or self.map_data[row][col] == '#':
+            return False
+        if obstruction not in self.first_visits:
+            # Off the original path: the patrol is unchanged
+            return self.fate[self.start[0] * self.cols + self.start[1]] == CYCLES
 
-        visited_states = set()
-        
-        # Find initial guard position
-        for r, row in enumerate(map_data):
-            for c, cell in enumerate(row):
-                if cell == '^':
-                    guard_position = (r, c)
+        n, cols = self.n, self.cols
+        position, direction = self.first_visits[obstruction]
+        visited_states, generation = self.stamps.stamps, self.stamps.new_generation()
+        state = direction * n + position
 
         while True:
-            state = (guard_position, current_direction)
-            if state in visited_states:
-                print(f"Loop detected with obstruction at {obstruction_position}")
+            min_row, max_row, min_col, max_col = self.boxes[state]
+            if not (min_row <= row <= max_row and min_col <= col <= max_col):
+                return self.fate[state] == CYCLES  # The rest of the patrol never meets the obstruction
+
+            if visited_states[state] == generation:
                 return True  # Loop detected
-            visited_states.add(state)
+            visited_states[state] = generation
 
-            next_row = guard_position[0] + directions[current_direction][0]
-            next_col = guard_position[1] + directions[current_direction][1]
+            stop = patched_stop(self.jump, n, cols, state % n, state // n, obstruction)
+            if stop == -1:
+                return False  # Guard leaves the mapped area
+            state = ((state // n + 1) % 4) * n + stop
 
-            if not (0 <= next_row < len(modified_map) and 0 <= next_col < len(modified_map[0])):
-                return False
+    def count_loop_positions(self):
+        """Counts the obstruction positions that trap the guard, like find_loop_positions."""
+        count = sum(self.would_trap(*divmod(cell, self.cols)) for cell in self.first_visits)
+        if self.loops:
+            # The original patrol already loops: every off-path cell traps the guard too
+            count += len(off_path_cells(self.map_data, self.start, self.first_visits))
+        return count
 
-            if modified_map[next_row][next_col] == '#':
-                current_direction = (current_direction + 1) % 4
-            else:
-                guard_position = (next_row, next_col)
+
+def find_loop_positions(map_data):
+    """
+    Finds all possible positions where a new obstruction can be placed to trap
+    the guard in a loop.
+
+    Only cells on the guard's original path can change the patrol, so only
+    those are tried, each starting from the guard state just before its first
+    visit to that cell. If the original patrol already loops, every cell off
+    its path traps the guard as well.
+
+    Args:
+        map_data (list[str]): The lab map as a list of strings.
+
+    Returns:
+        int: The number of valid positions where an obstruction can be placed.
+    """
+    rows, cols = len(map_data), len(map_data[0])
+    jump = build_jump_table(map_data)
+    start = find_guard(map_data)
+    first_visits, loops = trace_first_visits(map_data, start)
+    stamps = StateStamps(rows, cols)
 
     valid_positions = set()
-    
-    for r in range(len(map_data)):
-        for c in range(len(map_data[0])):
-            if map_data[r][c] == '.' and not any(map_data[r][c] == '^' for row in map_data):
-                print(f"Checking obstruction at position: {(r, c)}")
-                if simulate_with_obstruction((r, c)):
-                    valid_positions.add((r, c))
-    
+    if loops:
+        valid_positions.update(divmod(cell, cols) for cell in off_path_cells(map_data, start, first_visits))
+
+    for cell, (position, direction) in first_visits.items():
+        if simulate_with_obstruction(jump, rows, cols, position, direction, cell, stamps=stamps):
+            valid_positions.add(divmod(cell, cols))
+
     print(f"Valid positions for obstructions: {valid_positions}")
     return len(valid_positions)
 
 
+# Per-worker views onto the shared jump table and baseline path
+_shared_state = {}
+
+
+def _attach_shared_state(jump_name, jump_size, path_name, path_size, rows, cols):
+    """
+    Process-pool initializer: attaches each worker once to the shared jump
+    table and baseline path, so no task ever has to pickle the map.
+    """
+    jump_block = SharedMemory(name=jump_name)
+    path_block = SharedMemory(name=path_name)
+    _shared_state.update(
+        blocks=(jump_block, path_block),  # Keep the segments mapped for the worker's lifetime
+        jump=jump_block.buf[:jump_size].cast('i'),
+        path=path_block.buf[:path_size].cast('i'),
+        rows=rows,
+        cols=cols,
+        stamps=StateStamps(rows, cols),  # Allocated once per worker
+    )
+
+
+def _evaluate_candidate_chunk(bounds):
+    """
+    Tries the obstruction candidates path[start:end] (as stored in shared memory)
+    and returns the flattened cells that trap the guard in a loop.
+    """
+    start, end = bounds
+    jump, path = _shared_state['jump'], _shared_state['path']
+    rows, cols, stamps = _shared_state['rows'], _shared_state['cols'], _shared_state['stamps']
+    hits = []
+    for i in range(start, end):
+        cell, position, direction = path[3 * i], path[3 * i + 1], path[3 * i + 2]
+        if simulate_with_obstruction(jump, rows, cols, position, direction, cell, stamps=stamps):
+            hits.append(cell)
+    return hits
+
+
+def find_loop_positions_parallel(map_data, workers=None, chunk_size=256):
+    """
+    Parallel version of find_loop_positions using a process pool.
+
+    The jump table and the guard's baseline path (candidate cell, entry
+    position, entry direction) are written once into shared memory as flat
+    int arrays. The map itself is not shared since the jump table already
+    encodes it. Workers get chunks of candidate indices and return the cells
+    that cause a loop.
+
+    Args:
+        map_data (list[str]): The lab map as a list of strings.
+        workers (int): Number of worker processes (defaults to the CPU count).
+        chunk_size (int): Number of candidates per task.
+
+    Returns:
+        int: The number of valid positions where an obstruction can be placed.
+    """
+    rows, cols = len(map_data), len(map_data[0])
+    jump = build_jump_table(map_data)
+    start = find_guard(map_data)
+    first_visits, loops = trace_first_visits(map_data, start)
+
+    path = array('i')
+    for cell, (position, direction) in first_visits.items():
+        path.extend((cell, position, direction))
+
+    blocks = []
+    try:
+        for data in (jump.tobytes(), path.tobytes()):
+            block = SharedMemory(create=True, size=max(len(data), 1))
+            block.buf[:len(data)] = data
+            blocks.append(block)
+
+        initargs = (blocks[0].name, len(jump) * jump.itemsize, blocks[1].name, len(path) * path.itemsize, rows, cols)
+        chunks = [(start, min(start + chunk_size, len(first_visits))) for start in range(0, len(first_visits), chunk_size)]
+
+        valid_positions = set()
+        if loops:
+            # The original patrol already loops: off-path cells trap the guard without a trial
+            valid_positions.update(divmod(cell, cols) for cell in off_path_cells(map_data, start, first_visits))
+        with ProcessPoolExecutor(workers, initializer=_attach_shared_state, initargs=initargs) as pool:
+            for hits in pool.map(_evaluate_candidate_chunk, chunks):
+                valid_positions.update(divmod(cell, cols) for cell in hits)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return len(valid_positions)
+
+
+def parse_obstacle_input(file_path):
+    """
+    Reads a sparse lab map given as obstacle coordinates instead of a grid.
+
+    Expected format (one pair per line, comma separated):
+        rows,cols
+        guard_row,guard_col
+        obstacle_row,obstacle_col
+        ...
+
+    Args:
+        file_path (str): The path to the input file.
+
+    Returns:
+        SparseLabMap: The sparse map.
+    """
+    with open(file_path, 'r') as f:
+        pairs = [tuple(map(int, line.split(','))) for line in f if line.strip()]
+    (rows, cols), guard, obstacles = pairs[0], pairs[1], pairs[2:]
+    return SparseLabMap(rows, cols, guard, obstacles)
+
+
+class SparseLabMap:
+    """
+    A lab map stored as a sorted obstacle list per row and per column, for
+    huge and almost empty maps where a dense grid does not fit in memory.
+    Each straight-line move is resolved with a bisect in O(log k). Part 1 runs
+    on it with simulate_sparse_patrol and Part 2 with find_loop_positions_sparse;
+    the jump-table solvers (find_loop_positions, PatrolFates, ...) still need
+    the dense map.
+    """
+    def __init__(self, rows, cols, guard, obstacles):
+        self.rows = rows
+        self.cols = cols
+        self.guard = guard
+        row_obstacles = defaultdict(list)  # {row: [col, ...]}
+        col_obstacles = defaultdict(list)  # {col: [row, ...]}
+        for r, c in obstacles:
+            row_obstacles[r].append(c)
+            col_obstacles[c].append(r)
+        self.row_obstacles = {r: sorted(line) for r, line in row_obstacles.items()}
+        self.col_obstacles = {c: sorted(line) for c, line in col_obstacles.items()}
+
+    @classmethod
+    def from_map(cls, map_data):
+        """Builds a sparse map from a dense list-of-strings map."""
+        obstacles = [(r, c) for r, row in enumerate(map_data) for c, cell in enumerate(row) if cell == '#']
+        return cls(len(map_data), len(map_data[0]), find_guard(map_data), obstacles)
+
+    def next_stop(self, row, col, direction):
+        """
+        Finds where a guard at (row, col) facing `direction` stops.
+
+        Returns:
+            tuple[int, int, bool]: The stop (row, col) and whether the guard
+            leaves the map there (the stop is then the last cell on the edge).
+        """
+        if direction == 0:
+            line = self.col_obstacles.get(col, ())
+            i = bisect_left(line, row)
+            return (0, col, True) if i == 0 else (line[i - 1] + 1, col, False)
+        if direction == 1:
+            line = self.row_obstacles.get(row, ())
+            i = bisect_right(line, col)
+            return (row, self.cols - 1, True) if i == len(line) else (row, line[i] - 1, False)
+        if direction == 2:
+            line = self.col_obstacles.get(col, ())
+            i = bisect_right(line, row)
+            return (self.rows - 1, col, True) if i == len(line) else (line[i] - 1, col, False)
+        line = self.row_obstacles.get(row, ())
+        i = bisect_left(line, col)
+        return (row, 0, True) if i == 0 else (row, line[i - 1] + 1, False)
+
+
+def merge_intervals(segments):
+    """
+    Merges (key, start, end) segments into disjoint inclusive intervals per key.
+
+    Returns:
+        list[tuple[int, int, int]]: The merged (key, start, end) intervals.
+    """
+    merged = []
+    for key, start, end in sorted(segments):
+        if merged and merged[-1][0] == key and start <= merged[-1][2] + 1:
+            if end > merged[-1][2]:
+                merged[-1] = (key, merged[-1][1], end)
+        else:
+            merged.append((key, start, end))
+    return merged
+
+
+def count_segment_union(horizontal, vertical):
+    """
+    Counts the distinct cells covered by horizontal (row, col_start, col_end)
+    and vertical (col, row_start, row_end) segments.
+
+    After merging, cells are counted per interval and the crossings between
+    horizontal and vertical intervals are subtracted once. Crossings are found
+    with a row sweep over a Fenwick tree of active columns, in O(n log n).
+
+    Returns:
+        int: The number of distinct cells covered.
+    """
+    horizontal = merge_intervals(horizontal)
+    vertical = merge_intervals(vertical)
+    total = sum(end - start + 1 for _, start, end in horizontal + vertical)
+
+    columns = sorted({col for col, _, _ in vertical})
+    tree = [0] * (len(columns) + 1)
+
+    def update(col, delta):
+        i = bisect_left(columns, col) + 1
+        while i <= len(columns):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(i):
+        count = 0
+        while i > 0:
+            count += tree[i]
+            i -= i & -i
+        return count
+
+    # At equal rows: add vertical intervals, then query, then remove
+    events = []
+    for col, row_start, row_end in vertical:
+        events.append((row_start, 0, col, 0))
+        events.append((row_end, 2, col, 0))
+    for row, col_start, col_end in horizontal:
+        events.append((row, 1, col_start, col_end))
+
+    crossings = 0
+    for _, kind, first, last in sorted(events):
+        if kind == 0:
+            update(first, 1)
+        elif kind == 2:
+            update(first, -1)
+        else:
+            crossings += prefix(bisect_right(columns, last)) - prefix(bisect_left(columns, first))
+
+    return total - crossings
+
+
+def simulate_sparse_patrol(lab):
+    """
+    Simulates the Part 1 patrol on a sparse map, turn to turn, and counts the
+    distinct visited cells from the union of the straight segments walked.
+    Memory and time scale with obstacles and turns, not with the map area.
+
+    Args:
+        lab (SparseLabMap): The sparse lab map.
+
+    Returns:
+        int: The number of distinct positions visited by the guard.
+    """
+    row, col = lab.guard
+    direction = 0
+    horizontal, vertical = [], []
+    turn_states = set()  # Stops the patrol if it loops
+
+    while True:
+        stop_row, stop_col, leaves_map = lab.next_stop(row, col, direction)
+        if direction % 2 == 0:
+            vertical.append((col, min(row, stop_row), max(row, stop_row)))
+        else:
+            horizontal.append((row, min(col, stop_col), max(col, stop_col)))
+
+        if leaves_map or (stop_row, stop_col, direction) in turn_states:
+            break
+        turn_states.add((stop_row, stop_col, direction))
+        row, col = stop_row, stop_col
+        direction = (direction + 1) % 4
+
+    return count_segment_union(horizontal, vertical)
+
+
+
+def sparse_patched_stop(lab, row, col, direction, obstruction):
+    """
+    Sparse counterpart of patched_stop: finds where a guard at (row, col)
+    facing `direction` stops, using the added obstruction instead of the
+    map's obstacles if it is hit first.
+
+    Args:
+        lab (SparseLabMap): The sparse lab map.
+        row (int): The guard's row.
+        col (int): The guard's column.
+        direction (int): The guard's direction index.
+        obstruction (tuple[int, int]): The (row, col) of the added obstruction.
+
+    Returns:
+        tuple[int, int, bool]: As SparseLabMap.next_stop.
+    """
+    stop_row, stop_col, leaves_map = lab.next_stop(row, col, direction)
+    obstruction_row, obstruction_col = obstruction
+    d_row, d_col = DIRECTIONS[direction]
+
+    # The obstruction is hit first if it lies after (row, col) and no further than the stop
+    if direction % 2 == 0:
+        on_run = obstruction_col == col and 0 < (obstruction_row - row) * d_row <= (stop_row - row) * d_row
+    else:
+        on_run = obstruction_row == row and 0 < (obstruction_col - col) * d_col <= (stop_col - col) * d_col
+    if on_run:
+        return obstruction_row - d_row, obstruction_col - d_col, False
+    return stop_row, stop_col, leaves_map
+
+
+def simulate_sparse_with_obstruction(lab, row, col, direction, obstruction):
+    """
+    Simulates the guard on a sparse map from a given state with one
+    obstruction added, turn to turn.
+
+    Returns:
+        bool: True if the guard gets stuck in a loop; False otherwise.
+    """
+    turn_states = set()
+    while True:
+        row, col, leaves_map = sparse_patched_stop(lab, row, col, direction, obstruction)
+        if leaves_map:
+            return False
+        if (row, col, direction) in turn_states:
+            return True
+        turn_states.add((row, col, direction))
+        direction = (direction + 1) % 4
+
+
+def find_loop_positions_sparse(lab):
+    """
+    Part 2 on a sparse map: like find_loop_positions, tries an obstruction on
+    every cell of the original path, starting from the guard state just
+    before its first visit to that cell, but with sparse lookups instead of a
+    jump table over the whole map. Each trial costs O(turns * log k).
+
+    Memory scales with the length of the original path (one entry per
+    visited cell), not with the map area; time scales with the path length
+    times the turns of each trial.
+
+    Args:
+        lab (SparseLabMap): The sparse lab map.
+
+    Returns:
+        int: The number of valid positions where an obstruction can be placed.
+    """
+    row, col = lab.guard
+    direction = 0
+    seen = {lab.guard}
+    turn_states = set()
+    loop_positions = 0
+
+    while True:
+        stop_row, stop_col, leaves_map = lab.next_stop(row, col, direction)
+        d_row, d_col = DIRECTIONS[direction]
+
+        # Try each newly reached cell of this run, from the cell just before it
+        while (row, col) != (stop_row, stop_col):
+            cell = (row + d_row, col + d_col)
+            if cell not in seen:
+                seen.add(cell)
+                loop_positions += simulate_sparse_with_obstruction(lab, row, col, direction, cell)
+            row, col = cell
+
+        if leaves_map:
+            return loop_positions
+        if (row, col, direction) in turn_states:
+            # The original patrol already loops: every off-path free cell traps the guard too
+            obstacles = sum(len(line) for line in lab.row_obstacles.values())
+            return loop_positions + lab.rows * lab.cols - obstacles - len(seen)
+        turn_states.add((row, col, direction))
+        direction = (direction + 1) % 4
+
+def simulate_bounded_patrol(map_data):
+    """
+    Part 1 patrol that also terminates on maps where the guard loops.
+
+    Cycles are detected with Brent's algorithm over the guard state
+    (row, col, direction), which needs O(1) memory instead of a history of
+    visited states. Once the outcome is known, one more walk collects the
+    visited cells: up to the exit, or through the tail and one full loop.
+
+    Args:
+        map_data (list[str]): The lab map as a list of strings.
+
+    Returns:
+        tuple: (distinct_count, loop) where loop is None if the guard leaves
+        the map, otherwise (entry_state, loop_length, visited_cells) with
+        entry_state the first (row, col, direction) state on the cycle.
+    """
+    rows, cols = len(map_data), len(map_data[0])
+
+    def step(state):
+        """Advances the guard by one move or turn; None once it leaves the map."""
+        row, col, direction = state
+        next_row = row + DIRECTIONS[direction][0]
+        next_col = col + DIRECTIONS[direction][1]
+        if not (0 <= next_row < rows and 0 <= next_col < cols):
+            return None
+        if map_data[next_row][next_col] == '#':
+            return (row, col, (direction + 1) % 4)
+        return (next_row, next_col, direction)
+
+    start = find_guard(map_data) + (0,)
+
+    # Brent's algorithm: the tortoise teleports to the hare at powers of two
+    power = loop_length = 1
+    tortoise, hare = start, step(start)
+    while hare is not None and hare != tortoise:
+        if power == loop_length:
+            tortoise = hare
+            power *= 2
+            loop_length = 0
+        hare = step(hare)
+        loop_length += 1
+
+    if hare is None:
+        # The patrol exits: walk it once more, stamping visited cells
+        stamps = StateStamps(rows, cols)
+        visited, generation = stamps.stamps, stamps.new_generation()
+        visited_count = 0
+        state = start
+        while state is not None:
+            cell = state[0] * cols + state[1]
+            if visited[cell] != generation:
+                visited[cell] = generation
+                visited_count += 1
+            state = step(state)
+        return visited_count, None
+
+    # Find the cycle entry: start the hare loop_length steps ahead of the tortoise
+    tortoise = hare = start
+    for _ in range(loop_length):
+        hare = step(hare)
+    tail_length = 0
+    while tortoise != hare:
+        tortoise, hare = step(tortoise), step(hare)
+        tail_length += 1
+
+    visited_cells = set()
+    state = start
+    for _ in range(tail_length + loop_length):
+        visited_cells.add(state[:2])
+        state = step(state)
+
+    return len(visited_cells), (tortoise, loop_length, visited_cells)
+
+
+def simulate_guards_batch(map_data, starts, directions=None):
+    """
+    Simulates many guards on the same map at once, for example one per
+    starting cell for coverage analysis.
+
+    All guards' positions and directions live in NumPy arrays and advance
+    together, one straight run per iteration through the jump table. Guards
+    that leave the map are masked out; looping guards are detected with a
+    vectorized Brent's algorithm (a tortoise state per guard) and masked out
+    too, after their walk has covered the whole loop.
+
+    Args:
+        map_data (list[str]): The lab map as a list of strings.
+        starts (list[tuple[int, int]]): The (row, col) start of each guard.
+        directions (list[int]): Optional start direction index per guard (default up).
+
+    Returns:
+        tuple: (coverage, looped, heatmap) where coverage[i] is the number of
+        distinct cells guard i visits, looped[i] is True if guard i never leaves
+        the map, and heatmap is a rows x cols array counting the guards that
+        visit each cell.
+    """
+    import numpy as np
+
+    rows, cols = len(map_data), len(map_data[0])
+    n = rows * cols
+    jump = np.array(build_jump_table(map_data), dtype=np.int64)
+    blocked = np.frombuffer(''.join(map_data).encode(), dtype=np.uint8) == ord('#')
+
+    starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+    guard_count = len(starts)
+    position = starts[:, 0] * cols + starts[:, 1]
+    if blocked[position].any():
+        raise ValueError("Every guard must start on a free cell.")
+    direction = np.zeros(guard_count, dtype=np.int64) if directions is None else np.asarray(directions, dtype=np.int64)
+
+    # Flat cell offset of one step, and the edge cell reached when running off the map
+    step = np.array([-cols, 1, cols, -1], dtype=np.int64)
+
+    def edge_cells(position, direction):
+        row, col = position // cols, position % cols
+        return np.choose(direction, [col, row * cols + cols - 1, (rows - 1) * cols + col, row * cols])
+
+    active = np.ones(guard_count, dtype=bool)
+    looped = np.zeros(guard_count, dtype=bool)
+    tortoise = direction * n + position
+    power = np.ones(guard_count, dtype=np.int64)
+    loop_length = np.zeros(guard_count, dtype=np.int64)
+    visited_keys = []  # Chunks of guard * n + cell for every cell walked
+
+    while active.any():
+        guards = np.flatnonzero(active)
+        start, heading = position[guards], direction[guards]
+        stop = jump[heading * n + start]
+        exits = stop == -1
+        stop = np.where(exits, edge_cells(start, heading), stop)
+
+        # Expand every guard's straight run into the cells it covers
+        lengths = np.abs(stop - start) // np.abs(step[heading]) + 1
+        owner = np.repeat(np.arange(len(guards)), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        cells = start[owner] + offsets * step[heading[owner]]
+        visited_keys.append(guards[owner] * n + cells)
+
+        active[guards[exits]] = False
+        position[guards] = stop
+        direction[guards] = (heading + 1) % 4
+
+        # Brent's cycle check on the new turn state of the remaining guards
+        guards = guards[~exits]
+        state = direction[guards] * n + position[guards]
+        loop_length[guards] += 1
+        caught = state == tortoise[guards]
+        looped[guards[caught]] = True
+        active[guards[caught]] = False
+        teleport = power[guards] == loop_length[guards]
+        tortoise[guards[teleport]] = state[teleport]
+        power[guards[teleport]] *= 2
+        loop_length[guards[teleport]] = 0
+
+    visited = np.unique(np.concatenate(visited_keys)) if visited_keys else np.zeros(0, dtype=np.int64)
+    coverage = np.bincount(visited // n, minlength=guard_count)
+    heatmap = np.bincount(visited % n, minlength=n).reshape(rows, cols)
+    return coverage, looped, heatmap
+
+
 def main():
     """
     Main function to solve both parts of Day 6.
@@ -174,9 +1107,84 @@ def test():
     part_1_test_result = simulate_guard_patrol(example_map)
     assert part_1_test_result == 41, f"Test failed for Part 1. Expected: 41, Got: {part_1_test_result}"
     
+    stamps = StateStamps(3, 3)
+    stamps.generation = 0xFFFFFFFF  # Force the wrap on the next simulation
+    stamps.stamps[0] = stamps.stamps[3] = 1  # Stale stamps that must not count as visited
+    wrapped_test_result = simulate_guard_patrol(['...', '...', '^..'], stamps=stamps)
+    assert wrapped_test_result == 3, f"Test failed after a stamp wrap. Expected: 3, Got: {wrapped_test_result}"
+
+    recorder = TraceRecorder(len(example_map[0]))
+    simulate_guard_patrol(example_map, trace=recorder)
+    assert len({(r, c) for r, c, _ in recorder.replay()}) == 41, "Test failed for the recorded trace."
+
+    bounded_test_result, loop = simulate_bounded_patrol(example_map)
+    assert (bounded_test_result, loop) == (41, None), f"Test failed for bounded Part 1. Got: {bounded_test_result}"
+
+    looping_map = example_map[:6] + [".#.#^....."] + example_map[7:]  # Obstruction at (6, 3)
+    looping_count, (entry_state, loop_length, visited_cells) = simulate_bounded_patrol(looping_map)
+    assert (looping_count, entry_state, loop_length) == (18, (6, 4, 0), 22), \
+        f"Test failed for bounded Part 1 on a looping map. Got: {looping_count}, {entry_state}, {loop_length}"
+    assert len(visited_cells) == looping_count, "Test failed for the cells visited on a looping map."
+
+    sparse_test_result = simulate_sparse_patrol(SparseLabMap.from_map(example_map))
+    assert sparse_test_result == 41, f"Test failed for sparse Part 1. Expected: 41, Got: {sparse_test_result}"
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        obstacle_path = os.path.join(work_dir, "obstacles.txt")
+        with open(obstacle_path, 'w') as f:
+            f.write(f"{len(example_map)},{len(example_map[0])}\n")
+            f.write("{},{}\n".format(*find_guard(example_map)))
+            for r, row in enumerate(example_map):
+                for c, cell in enumerate(row):
+                    if cell == '#':
+                        f.write(f"{r},{c}\n")
+        sparse_lab = parse_obstacle_input(obstacle_path)
+    sparse_file_result = simulate_sparse_patrol(sparse_lab)
+    assert sparse_file_result == 41, f"Test failed for the obstacle file. Expected: 41, Got: {sparse_file_result}"
+
+    sparse_part_2_result = find_loop_positions_sparse(sparse_lab)
+    assert sparse_part_2_result == 6, f"Test failed for sparse Part 2. Expected: 6, Got: {sparse_part_2_result}"
+
     part_2_test_result = find_loop_positions(example_map)
     assert part_2_test_result == 6, f"Test failed for Part 2. Expected: 6, Got: {part_2_test_result}"
 
+    fates_test_result = PatrolFates(example_map).count_loop_positions()
+    assert fates_test_result == 6, f"Test failed for Part 2 with fates. Expected: 6, Got: {fates_test_result}"
+
+    coverage, looped, heatmap = simulate_guards_batch(example_map, [find_guard(example_map)])
+    assert coverage[0] == 41 and not looped[0], f"Test failed for batch Part 1. Expected: 41, Got: {coverage[0]}"
+
+    def walk_guard(map_data, row, col, direction):
+        # One guard, one step at a time: (distinct cells visited, loops)
+        cells, states = set(), set()
+        while (row, col, direction) not in states:
+            states.add((row, col, direction))
+            cells.add((row, col))
+            next_row, next_col = row + DIRECTIONS[direction][0], col + DIRECTIONS[direction][1]
+            if not (0 <= next_row < len(map_data) and 0 <= next_col < len(map_data[0])):
+                return cells, False
+            if map_data[next_row][next_col] == '#':
+                direction = (direction + 1) % 4
+            else:
+                row, col = next_row, next_col
+        return cells, True
+
+    # One guard per free cell with mixed start directions, some of which loop
+    starts = [(r, c) for r, row in enumerate(looping_map) for c, cell in enumerate(row) if cell != '#']
+    directions = [(r + 2 * c) % 4 for r, c in starts]
+    coverage, looped, heatmap = simulate_guards_batch(looping_map, starts, directions)
+    expected_heatmap = [[0] * len(looping_map[0]) for _ in looping_map]
+    for i, ((r, c), direction) in enumerate(zip(starts, directions)):
+        cells, loops = walk_guard(looping_map, r, c, direction)
+        assert (coverage[i], looped[i]) == (len(cells), loops), f"Test failed for batch guard {i} at {(r, c)}."
+        for cell_row, cell_col in cells:
+            expected_heatmap[cell_row][cell_col] += 1
+    assert looped.any() and not looped.all(), "Test failed: the batch should mix looping and exiting guards."
+    assert heatmap.tolist() == expected_heatmap, "Test failed for the batch heatmap."
+
+    parallel_test_result = find_loop_positions_parallel(example_map, workers=2, chunk_size=8)
+    assert parallel_test_result == 6, f"Test failed for parallel Part 2. Expected: 6, Got: {parallel_test_result}"
+
     print("All tests passed!")
 
 
@@ -5,6 +5,77 @@
 # - Part 2: Adds `||` (concatenation) to the operators.
 # The input is read from a file named "input.txt".
 
+from concurrent.futures import ProcessPoolExecutor
+
+class Operator:
+    """
+    An operator that can be inserted between two numbers.
+
+    `apply(a, b, place)` computes `a op b`, and the optional `invert(result, b, place)`
+    returns the left operand `a` such that `a op b == result`, `None` if there is
+    none, or `ANY_VALUE` if every `a` works. `place` is `digit_place(b)`, which
+    the search loops precompute once per operand. The optional `source` is the
+    same computation as a Python expression in `a`, `b` and `place`, which
+    `specialized_solver` inlines into the solvers it generates.
+    """
+    def __init__(self, symbol, apply, invert=None, source=None):
+        self.symbol = symbol
+        self.apply = apply
+        self.invert = invert
+        self.source = source
+
+# Returned by Operator.invert when any left operand produces the result (e.g. x * 0 == 0)
+ANY_VALUE = object()
+
+# Registry of known operators by symbol; add new ones with register_operator
+OPERATORS = {}
+
+# Cache of generated solvers, keyed by the tuple of allowed operator symbols
+_solver_cache = {}
+
+def register_operator(symbol, apply, invert=None, source=None):
+    """
+    Registers an operator so that every evaluator and solver can use it
+    without changes to their search loops.
+
+    :param symbol: Symbol used in `allowed_ops` (e.g., '+').
+    :param apply: Function (a, b, place) -> a op b.
+    :param invert: Optional function (result, b, place) -> a, None or ANY_VALUE.
+    :param source: Optional expression in `a`, `b` and `place` equal to `apply`.
+    :return: The registered Operator.
+    """
+    OPERATORS[symbol] = Operator(symbol, apply, invert, source)
+    _solver_cache.clear()  # Generated solvers may have inlined the old definition
+    return OPERATORS[symbol]
+
+def digit_place(number):
+    """
+    Returns 10 ** (number of decimal digits of `number`), so that concatenation
+    is `a * digit_place(b) + b`. Zero has one digit, as in `str(0)`.
+    """
+    place = 10
+    while place <= number:
+        place *= 10
+    return place
+
+def _invert_add(result, number, place):
+    # Undo addition by subtraction, only if the result stays non-negative
+    return result - number if result >= number else None
+
+def _invert_multiply(result, number, place):
+    # Undo multiplication by exact division
+    if number == 0:
+        return ANY_VALUE if result == 0 else None
+    return result // number if result % number == 0 else None
+
+def _invert_concatenate(result, number, place):
+    # Undo concatenation by stripping the operand's digits, if the suffix matches
+    return result // place if result % place == number else None
+
+register_operator('+', lambda a, b, place: a + b, _invert_add, 'a + b')
+register_operator('*', lambda a, b, place: a * b, _invert_multiply, 'a * b')
+register_operator('||', lambda a, b, place: a * place + b, _invert_concatenate, 'a * place + b')
+
 def read_input(file_path):
     """
     Reads the input from the specified file and parses it into a list of tuples.
@@ -51,13 +122,7 @@ def evaluate_expression(numbers, ops):
     """
     result = numbers[0]
     for i in range(len(ops)):
-        if ops[i] == '+':
-            result += numbers[i + 1]
-        elif ops[i] == '*':
-            result *= numbers[i + 1]
-        elif ops[i] == '||':
-            # Concatenate the digits of the two numbers
-            result = int(str(result) + str(numbers[i + 1]))
+        result = OPERATORS[ops[i]].apply(result, numbers[i + 1], digit_place(numbers[i + 1]))
     return result
 
 def can_form_target(target, numbers, allowed_ops):
@@ -84,13 +149,8 @@ def can_form_target(target, numbers, allowed_ops):
             return memo[key]
 
         # Try all allowed operators with the next number
-        for op in allowed_ops:
-            if op == '+':
-                next_value = current_value + numbers[index]
-            elif op == '*':
-                next_value = current_value * numbers[index]
-            elif op == '||':
-                next_value = int(str(current_value) + str(numbers[index]))
+        for operator in operators:
+            next_value = operator.apply(current_value, numbers[index], places[index])
 
             # Recurse to process the next number
             if helper(index + 1, next_value):
@@ -102,9 +162,436 @@ def can_form_target(target, numbers, allowed_ops):
         return False
 
     # Initialize memoization dictionary and start recursion
+    operators = [OPERATORS[op] for op in allowed_ops]
+    places = [digit_place(number) for number in numbers]
     memo = {}
     return helper(1, numbers[0])
 
+_SOLVER_TEMPLATE = """
+def solver(target, numbers):
+    places = [digit_place(number) for number in numbers]
+    last = len(numbers)
+    memo = {{}}
+
+    def helper(index, a):
+        if index == last:
+            return a == target
+        key = (index, a)
+        if key in memo:
+            return memo[key]
+        b = numbers[index]
+        place = places[index]
+{branches}
+        memo[key] = False
+        return False
+
+    return helper(1, numbers[0])
+"""
+
+_BRANCH_TEMPLATE = """        if helper(index + 1, {expression}):
+            memo[key] = True
+            return True
+"""
+
+def specialized_solver(allowed_ops):
+    """
+    Returns a solver equivalent to `can_form_target` for one operator set,
+    generated with the operators unrolled into hardcoded branches, so that no
+    per-state loop over the operators or `apply` call remains. For example,
+    ['+', '*'] gives a body that tries `a + b`, then `a * b`. Operators without
+    a `source` expression are called through their `apply` instead.
+    Solvers are generated once per operator set and cached.
+
+    :param allowed_ops: List of allowed operators (e.g., ['+', '*'] for Part 1).
+    :return: Function (target, numbers) -> True if the target can be formed.
+    """
+    key = tuple(allowed_ops)
+    if key not in _solver_cache:
+        namespace = {'digit_place': digit_place}
+        branches = []
+        for index, op in enumerate(allowed_ops):
+            operator = OPERATORS[op]
+            expression = operator.source
+            if expression is None:
+                namespace[f'apply_{index}'] = operator.apply
+                expression = f'apply_{index}(a, b, place)'
+            branches.append(_BRANCH_TEMPLATE.format(expression=f'({expression})'))
+        exec(_SOLVER_TEMPLATE.format(branches=''.join(branches)), namespace)
+        _solver_cache[key] = namespace['solver']
+    return _solver_cache[key]
+
+class _SearchBudgetExceeded(Exception):
+    # Unwinds a budgeted search once it has visited too many states
+    pass
+
+def can_form_target_backward(target, numbers, allowed_ops, max_states=None):
+    """
+    Determines if a target value can be formed, like `can_form_target`, but
+    searches backward from the target by inverting each operator against the
+    last operand:
+        - `+`  is undone by subtraction, only if the result stays non-negative.
+        - `*`  is undone by division, only if it is exact.
+        - `||` is undone by stripping the operand's digits, only if the
+          target's decimal suffix matches the operand.
+
+    Most branches fail these checks immediately, so the search stays tiny even
+    on long equations. States already known to fail are remembered, which keeps
+    degenerate inputs (e.g. long runs of 1s, which every inverse accepts) from
+    being searched again and again. Operands are assumed to be non-negative,
+    as in the puzzle. Falls back to the specialized forward search if an
+    allowed operator has no inverse.
+
+    :param target: Target value for the equation.
+    :param numbers: List of numbers in the equation.
+    :param allowed_ops: List of allowed operators (e.g., ['+', '*'] for Part 1).
+    :param max_states: Optional limit on the number of states searched.
+    :return: True if the target can be formed, False otherwise, or None if
+             `max_states` ran out before the search finished.
+    """
+    operators = [OPERATORS[op] for op in allowed_ops]
+    if any(operator.invert is None for operator in operators):
+        return specialized_solver(allowed_ops)(target, numbers)  # Not invertible: search forward
+    places = [digit_place(number) for number in numbers]
+    failed = set()  # {(index, remaining), ...} known not to reach the first number
+
+    def helper(index, remaining):
+        # Base case: only the first number is left, it must match exactly
+        if index == 0:
+            return remaining == numbers[0]
+
+        key = (index, remaining)
+        if key in failed:
+            return False
+        if max_states is not None and len(failed) >= max_states:
+            raise _SearchBudgetExceeded
+
+        for operator in operators:
+            previous = operator.invert(remaining, numbers[index], places[index])
+            if previous is ANY_VALUE or (previous is not None and helper(index - 1, previous)):
+                return True
+        failed.add(key)
+        return False
+
+    try:
+        return helper(len(numbers) - 1, target)
+    except _SearchBudgetExceeded:
+        return None
+
+def can_form_target_meet_in_middle(target, numbers, allowed_ops):
+    """
+    Determines if a target value can be formed, using a meet-in-the-middle
+    search for very long equations.
+
+    Values reachable from the left half of the numbers are enumerated forward,
+    dropping any that exceed the target (no operator decreases a positive value,
+    so this is only done when no later number is zero). The values the left
+    half would need to produce are enumerated backward from the target over
+    the right half with the inverse operators. The equation is solvable if the
+    two sets meet.
+
+    :param target: Target value for the equation.
+    :param numbers: List of numbers in the equation.
+    :param allowed_ops: List of allowed operators.
+    :return: True if the target can be formed, False otherwise.
+    """
+    operators = [OPERATORS[op] for op in allowed_ops]
+    if any(operator.invert is None for operator in operators):
+        return specialized_solver(allowed_ops)(target, numbers)  # Not invertible: search forward
+    places = [digit_place(number) for number in numbers]
+    middle = max(1, len(numbers) // 2)  # Numbers before `middle` form the left half
+    prune = 0 not in numbers[1:]
+
+    # Backward from the target over the right half
+    needed = {target}
+    for index in range(len(numbers) - 1, middle - 1, -1):
+        previous_values = set()
+        for remaining in needed:
+            for operator in operators:
+                previous = operator.invert(remaining, numbers[index], places[index])
+                if previous is ANY_VALUE:
+                    return True  # Any left part works (e.g. multiplied by zero)
+                if previous is not None:
+                    previous_values.add(previous)
+        needed = previous_values
+        if not needed:
+            return False
+
+    # Forward from the first number over the left half
+    reachable = {numbers[0]}
+    for index in range(1, middle):
+        reachable = {
+            operator.apply(value, numbers[index], places[index])
+            for value in reachable
+            for operator in operators
+        }
+        if prune:
+            reachable = {value for value in reachable if value <= target}
+
+    return not reachable.isdisjoint(needed)
+
+# States the backward search may visit before solve_equation switches to meet-in-the-middle
+BACKWARD_STATE_BUDGET = 100_000
+
+def solve_equation(target, numbers, allowed_ops):
+    """
+    Determines if a target value can be formed with the memoized backward
+    search, falling back to meet-in-the-middle only if the backward search
+    visits more than `BACKWARD_STATE_BUDGET` states and the left half that
+    meet-in-the-middle enumerates forward is no larger than that budget.
+    Length alone is a poor guide: the backward search stays fast on typical
+    long equations, where meet-in-the-middle must enumerate every forward
+    value of the left half (see `benchmark_solvers`).
+
+    :param target: Target value for the equation.
+    :param numbers: List of numbers in the equation.
+    :param allowed_ops: List of allowed operators.
+    :return: True if the target can be formed, False otherwise.
+    """
+    left_half_values = len(allowed_ops) ** (max(1, len(numbers) // 2) - 1)
+    if left_half_values > BACKWARD_STATE_BUDGET:
+        return can_form_target_backward(target, numbers, allowed_ops)
+
+    solvable = can_form_target_backward(target, numbers, allowed_ops, max_states=BACKWARD_STATE_BUDGET)
+    if solvable is None:
+        return can_form_target_meet_in_middle(target, numbers, allowed_ops)
+    return solvable
+
+def benchmark_solvers(lengths=(8, 12, 16, 21, 25), samples=20, allowed_ops=('+', '*', '||'), seed=0):
+    """
+    Times the backward and meet-in-the-middle solvers on random equations with
+    operands 1-9 (half of them solvable), and on all-1 operands, the
+    degenerate shape that used to favour meet-in-the-middle. Prints one line
+    per length, e.g.:
+        python -c "import solution; solution.benchmark_solvers()"
+
+    :param lengths: Operand counts to benchmark.
+    :param samples: Random equations per length.
+    :param allowed_ops: Operators to solve with.
+    :param seed: Seed for the random equations.
+    :return: None
+    """
+    import random
+    import time
+
+    allowed_ops = list(allowed_ops)
+    generator = random.Random(seed)
+    for length in lengths:
+        equations = []
+        for sample in range(samples):
+            numbers = [generator.randint(1, 9) for _ in range(length)]
+            ops = [generator.choice(allowed_ops) for _ in range(length - 1)]
+            equations.append((evaluate_expression(numbers, ops) + sample % 2, numbers))
+        ones = [(10 ** (length // 2) + 7, [1] * length)]
+
+        timings = []
+        for solver in (can_form_target_backward, can_form_target_meet_in_middle):
+            for batch in (equations, ones):
+                start = time.perf_counter()
+                for target, numbers in batch:
+                    solver(target, numbers, allowed_ops)
+                timings.append(time.perf_counter() - start)
+
+        print(f"{length} operands - random: backward {timings[0]:.4f}s, meet-in-the-middle {timings[2]:.4f}s; "
+              f"all-1: backward {timings[1]:.4f}s, meet-in-the-middle {timings[3]:.4f}s")
+
+def _solution_counter(target, numbers, allowed_ops):
+    """
+    Builds the memoized DP behind `count_solutions` and `find_witness`.
+
+    `count(index, remaining)` is the number of operator assignments for which
+    numbers[0..index] evaluates to `remaining`. It only visits the states the
+    backward solver reaches, so paths are counted without being enumerated.
+
+    :return: Tuple (count, operators, places).
+    """
+    operators = [OPERATORS[op] for op in allowed_ops]
+    if any(operator.invert is None for operator in operators):
+        raise ValueError("Counting solutions requires every allowed operator to have an inverse.")
+    places = [digit_place(number) for number in numbers]
+    memo = {}
+
+    def count(index, remaining):
+        if index == 0:
+            return 1 if remaining == numbers[0] else 0
+
+        key = (index, remaining)
+        if key in memo:
+            return memo[key]
+
+        total = 0
+        for operator in operators:
+            previous = operator.invert(remaining, numbers[index], places[index])
+            if previous is ANY_VALUE:
+                total += len(operators) ** (index - 1)  # Every assignment of the earlier operators works
+            elif previous is not None:
+                total += count(index - 1, previous)
+
+        memo[key] = total
+        return total
+
+    return count, operators, places
+
+def count_solutions(target, numbers, allowed_ops):
+    """
+    Counts the distinct operator assignments that make the equation hit the target.
+
+    :param target: Target value for the equation.
+    :param numbers: List of numbers in the equation.
+    :param allowed_ops: List of allowed (invertible) operators.
+    :return: Number of operator sequences that evaluate to the target.
+    """
+    count, _, _ = _solution_counter(target, numbers, allowed_ops)
+    return count(len(numbers) - 1, target)
+
+def find_witness(target, numbers, allowed_ops):
+    """
+    Reconstructs one operator sequence that makes the equation hit the target,
+    following the counted DP states back from the target.
+
+    Example:
+        find_witness(3267, [81, 40, 27], ['+', '*']) -> ['*', '+']
+
+    :param target: Target value for the equation.
+    :param numbers: List of numbers in the equation.
+    :param allowed_ops: List of allowed (invertible) operators.
+    :return: List of operators, or None if the target cannot be formed.
+    """
+    count, operators, places = _solution_counter(target, numbers, allowed_ops)
+    index, remaining = len(numbers) - 1, target
+    if count(index, remaining) == 0:
+        return None
+
+    witness = []  # Built from the last operator backward
+    while index > 0:
+        for operator in operators:
+            previous = operator.invert(remaining, numbers[index], places[index])
+            if previous is ANY_VALUE:
+                # Any earlier operators work: pick the first allowed one everywhere
+                witness.append(operator.symbol)
+                witness.extend([operators[0].symbol] * (index - 1))
+                index = 0
+                break
+            if previous is not None and count(index - 1, previous) > 0:
+                witness.append(operator.symbol)
+                index, remaining = index - 1, previous
+                break
+
+    return witness[::-1]
+
+# Equations with at most this many operator combinations are evaluated by batched brute force;
+# measured against the backward solver on 2000-equation groups, batching stops winning above 3 ** 4
+BRUTE_FORCE_LIMIT = 81
+
+# Cache of operator-combination matrices, keyed by (number count, operator count)
+_combination_cache = {}
+
+def operator_combinations(length, operator_count):
+    """
+    Returns the matrix of every operator combination for equations of `length`
+    numbers: one row per combination, one column per gap, holding operator
+    indices. Built once per shape and cached.
+
+    :param length: Number of numbers in the equation.
+    :param operator_count: Number of allowed operators.
+    :return: NumPy int array of shape (operator_count ** (length - 1), length - 1).
+    """
+    import numpy as np
+
+    key = (length, operator_count)
+    if key not in _combination_cache:
+        gaps = length - 1
+        grid = np.indices((operator_count,) * gaps).reshape(gaps, operator_count ** gaps).T
+        _combination_cache[key] = grid
+    return _combination_cache[key]
+
+def can_form_targets_batched(equations, allowed_ops):
+    """
+    Evaluates every operator combination of a group of equations that all have
+    the same number of operands, with NumPy operations over the whole group.
+
+    Values are evaluated column by column for all equations and combinations
+    at once. Anything above an equation's target is clipped to target + 1:
+    operands are non-negative, so such a value can never come back down to the
+    target except through `* 0`, which gives 0 either way. That bounds every
+    intermediate value, and int64 is used for every equation whose bound fits;
+    the others fall back to Python ints (object dtype). Each operator's
+    `apply` must work elementwise on arrays, as the registered ones do.
+
+    :param equations: List of (target, [numbers]) with equal-length number lists.
+    :param allowed_ops: List of allowed operators.
+    :return: List of booleans, True where the target can be formed.
+    """
+    import numpy as np
+
+    operators = [OPERATORS[op] for op in allowed_ops]
+    combinations = operator_combinations(len(equations[0][1]), len(operators))
+    places = [[digit_place(number) for number in numbers] for _, numbers in equations]
+
+    # Overflow guard, per equation: the largest intermediate is at most
+    # (cap * place + number) or (cap * number)
+    fits_int64 = [
+        (target + 1) * max(row_places + numbers) * 2 < 2 ** 63
+        for (target, numbers), row_places in zip(equations, places)
+    ]
+
+    results = [False] * len(equations)
+    for dtype, fits in ((np.int64, True), (object, False)):
+        indices = [index for index, fit in enumerate(fits_int64) if fit == fits]
+        if indices:
+            solved = _evaluate_combinations(
+                [equations[index] for index in indices], [places[index] for index in indices],
+                operators, combinations, dtype,
+            )
+            for index, result in zip(indices, solved):
+                results[index] = result
+    return results
+
+def _evaluate_combinations(equations, places, operators, combinations, dtype):
+    # Evaluates every combination for a group of same-length equations in one dtype
+    import numpy as np
+
+    caps = np.array([target for target, _ in equations], dtype=dtype)[:, None] + 1
+    number_matrix = np.array([numbers for _, numbers in equations], dtype=dtype)
+    place_matrix = np.array(places, dtype=dtype)
+
+    values = np.repeat(np.minimum(number_matrix[:, :1], caps), len(combinations), axis=1)
+    for gap in range(combinations.shape[1]):
+        operand = number_matrix[:, gap + 1:gap + 2]
+        place = place_matrix[:, gap + 1:gap + 2]
+        next_values = np.empty_like(values)
+        for index, operator in enumerate(operators):
+            chosen = combinations[:, gap] == index
+            next_values[:, chosen] = operator.apply(values[:, chosen], operand, place)
+        values = np.minimum(next_values, caps)
+
+    return (values == caps - 1).any(axis=1).tolist()
+
+def solve_equations(equations, allowed_ops):
+    """
+    Determines which equations can be made valid, choosing the strategy by
+    equation shape: equations are grouped by operand count, groups with at
+    most `BRUTE_FORCE_LIMIT` operator combinations are evaluated all at once
+    by `can_form_targets_batched`, and longer ones go to `solve_equation`.
+
+    :param equations: List of (target, [numbers]) tuples.
+    :param allowed_ops: List of allowed operators.
+    :return: List of booleans, True where the target can be formed.
+    """
+    results = [False] * len(equations)
+    groups = {}  # {operand count: [equation index, ...]}
+    for index, (_, numbers) in enumerate(equations):
+        groups.setdefault(len(numbers), []).append(index)
+
+    for length, indices in groups.items():
+        if len(allowed_ops) ** (length - 1) <= BRUTE_FORCE_LIMIT:
+            solved = can_form_targets_batched([equations[index] for index in indices], allowed_ops)
+        else:
+            solved = [solve_equation(*equations[index], allowed_ops) for index in indices]
+        for index, result in zip(indices, solved):
+            results[index] = result
+
+    return results
+
 def calculate_total_calibration(file_path, allowed_ops):
     """
     Calculates the total calibration result by summing up all valid test values,
@@ -124,13 +611,47 @@ def calculate_total_calibration(file_path, allowed_ops):
     equations = read_input(file_path)
     total_calibration = 0
     
-    for target, numbers in equations:
-        # Check if this equation is valid using recursive function with memoization
-        if can_form_target(target, numbers, allowed_ops):
+    # Check which equations are valid with the strategy suited to their shape
+    for (target, _), solvable in zip(equations, solve_equations(equations, allowed_ops)):
+        if solvable:
             total_calibration += target
     
     return total_calibration
 
+def calibrate_equation(equation):
+    """
+    Tests one equation for both parts at once: first with `+` and `*`, and
+    only if that fails, escalating to `+`, `*` and `||`. An equation solvable
+    in Part 1 is solvable in Part 2 too, so it is never solved twice.
+
+    :param equation: A (target_value, [numbers]) tuple.
+    :return: Tuple (part_1_value, part_2_value), each the target or 0.
+    """
+    target, numbers = equation
+    if solve_equation(target, numbers, ['+', '*']):
+        return target, target
+    if solve_equation(target, numbers, ['+', '*', '||']):
+        return 0, target
+    return 0, 0
+
+def calculate_both_calibrations(equations, workers=None, chunksize=256):
+    """
+    Calculates the Part 1 and Part 2 calibration results together, spreading
+    the equations across a process pool in chunks so that large calibration
+    files use every core.
+
+    :param equations: Parsed equations, as returned by `read_input`.
+    :param workers: Number of worker processes (defaults to the CPU count).
+    :param chunksize: Number of equations sent to a worker per task.
+    :return: Tuple (part_1_total, part_2_total).
+    """
+    part_1_total = part_2_total = 0
+    with ProcessPoolExecutor(workers) as pool:
+        for part_1_value, part_2_value in pool.map(calibrate_equation, equations, chunksize=chunksize):
+            part_1_total += part_1_value
+            part_2_total += part_2_value
+    return part_1_total, part_2_total
+
 def test_example():
     """
     Tests both Part 1 and Part 2 logic using the example provided in the puzzle description.
@@ -179,6 +700,27 @@ def test_example():
     print(f"Test Example - Part 1 Result: {part_1_result} (Expected: {3749})")
     print(f"Test Example - Part 2 Result: {part_2_result} (Expected: {11387})")
 
+    # The backward solver must agree with the forward search
+    backward_part_1 = sum(target for target, nums in example_data if can_form_target_backward(target, nums, ['+', '*']))
+    backward_part_2 = sum(target for target, nums in example_data if can_form_target_backward(target, nums, ['+', '*', '||']))
+    print(f"Test Example - Backward Part 1 Result: {backward_part_1} (Expected: {3749})")
+    print(f"Test Example - Backward Part 2 Result: {backward_part_2} (Expected: {11387})")
+
+    middle_part_2 = sum(target for target, nums in example_data if can_form_target_meet_in_middle(target, nums, ['+', '*', '||']))
+    print(f"Test Example - Meet-in-the-Middle Part 2 Result: {middle_part_2} (Expected: {11387})")
+
+    specialized_part_2 = sum(target for target, nums in example_data if specialized_solver(['+', '*', '||'])(target, nums))
+    print(f"Test Example - Specialized Part 2 Result: {specialized_part_2} (Expected: {11387})")
+
+    batched_part_2 = sum(target for (target, _), solvable in zip(example_data, solve_equations(example_data, ['+', '*', '||'])) if solvable)
+    print(f"Test Example - Batched Part 2 Result: {batched_part_2} (Expected: {11387})")
+
+    witness = find_witness(7290, [6, 8, 6, 15], ['+', '*', '||'])
+    print(f"Test Example - Witness for 7290: {witness} (Expected: {['*', '||', '*']})")
+
+    fused_part_1, fused_part_2 = calculate_both_calibrations(example_data, workers=2, chunksize=4)
+    print(f"Test Example - Fused Results: {fused_part_1}, {fused_part_2} (Expected: {3749}, {11387})")
+
 if __name__ == "__main__":
     # Input file containing the equations
     input_file = "input.txt"
@@ -187,11 +729,9 @@ if __name__ == "__main__":
     print("Running Test Example...")
     test_example()
     
-    # Part 1: Only addition (+) and multiplication (*) are allowed
-    part_1_result = calculate_total_calibration(input_file, allowed_ops=['+', '*'])
-    
-    # Part 2: Addition (+), multiplication (*), and concatenation (||) are allowed
-    part_2_result = calculate_total_calibration(input_file, allowed_ops=['+', '*', '||'])
+    # Parse once and solve both parts together:
+    # Part 1 allows + and *, Part 2 adds || only for equations Part 1 could not solve
+    part_1_result, part_2_result = calculate_both_calibrations(read_input(input_file))
     
     # Print results for both parts
     print(f"Part 1 - Total Calibration Result (using + and *): {part_1_result}")
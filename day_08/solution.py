@@ -1,5 +1,8 @@
 from collections import defaultdict
-from typing import List, Tuple
+from math import gcd
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
 
 def calculate_antinodes(grid: List[str]) -> Tuple[int, List[str]]:
     """
@@ -16,11 +19,10 @@ def calculate_antinodes(grid: List[str]) -> Tuple[int, List[str]]:
             - The number of unique antinode locations.
             - A modified grid with antinodes marked by '#'.
     """
-
     rows = len(grid)
     cols = len(grid[0])
     antenna_locations = defaultdict(list)  # {frequency: [(row, col), ...]}
-    antinode_locations = set()  # {(row, col), ...}
+    antinode_bitmap = np.zeros(rows * cols, dtype=bool)  # True at row * cols + col for each antinode
 
     # 1. Record antenna locations for each frequency
     for row_index, row in enumerate(grid):
@@ -28,99 +30,43 @@ def calculate_antinodes(grid: List[str]) -> Tuple[int, List[str]]:
             if cell != '.':
                 antenna_locations[cell].append((row_index, col_index))
 
-    modified_grid = [list(row) for row in grid]  # Copy grid to mark antinodes
-
-    # 2. Process each frequency to find antinodes
+    # 2. Compute the antinodes of every pair of each frequency at once
     for frequency, locations in antenna_locations.items():
-        num_antennas = len(locations)
-
-        # 3. Check for antinodes formed by pairs of antennas
-        for i in range(num_antennas):
-            for j in range(i + 1, num_antennas):
-                r1, c1 = locations[i]  # Antenna 1
-                r2, c2 = locations[j]  # Antenna 2
-
-                # Calculate potential antinode locations
-                row_diff, col_diff = r2 - r1, c2 - c1
-                # Antinode where Antenna 1 is closer
-                antinode1 = (r1 - row_diff, c1 - col_diff)
-                # Antinode where Antenna 2 is closer
-                antinode2 = (r2 + row_diff, c2 + col_diff)
-
-                # Check if potential antinodes are valid and mark them
-                for antinode_r, antinode_c in [antinode1, antinode2]:
-                    if 0 <= antinode_r < rows and 0 <= antinode_c < cols:
-                        if is_valid_antinode(r1, c1, r2, c2, antinode_r, antinode_c):
-                            antinode_locations.add((antinode_r, antinode_c))
-                            mark_antinode(modified_grid, antinode_r, antinode_c)
-
-        # 4. Check for antinodes formed by three or more antennas (trios)
-        for i in range(num_antennas):
-            for j in range(i + 1, num_antennas):
-                for k in range(j + 1, num_antennas):
-                    r1, c1 = locations[i]  # Antenna 1
-                    r2, c2 = locations[j]  # Antenna 2
-                    r3, c3 = locations[k]  # Antenna 3 (potential antinode)
-
-                    if is_antinode_from_trio(r1, c1, r2, c2, r3, c3):
-                        if 0 <= r3 < rows and 0 <= c3 < cols:
-                            antinode_locations.add((r3, c3))
-                            mark_antinode(modified_grid, r3, c3)
-
-    return len(antinode_locations), ["".join(row) for row in modified_grid]
-
-def is_valid_antinode(r1: int, c1: int, r2: int, c2: int, antinode_r: int, antinode_c: int) -> bool:
-    """
-    Checks if a given point is a valid antinode formed by two antennas.
-    The antinode is valid if one antenna is twice as far from it as the other.
+        antinode_bitmap[find_pair_antinodes(locations, rows, cols)] = True
 
-    Args:
-        r1, c1: Coordinates of the first antenna.
-        r2, c2: Coordinates of the second antenna.
-        antinode_r, antinode_c: Coordinates of the potential antinode.
+    # 3. Mark antinodes on a copy of the grid, leaving antennas visible
+    modified_grid = [list(row) for row in grid]
+    for index in np.flatnonzero(antinode_bitmap):
+        mark_antinode(modified_grid, index // cols, index % cols)
 
-    Returns:
-        True if the point is a valid antinode, False otherwise.
-    """
-    dist_sq_1 = (r1 - antinode_r) ** 2 + (c1 - antinode_c) ** 2  # Squared distance to Antenna 1
-    dist_sq_2 = (r2 - antinode_r) ** 2 + (c2 - antinode_c) ** 2  # Squared distance to Antenna 2
-    dist_sq_between = (r2 - r1) ** 2 + (c2 - c1) ** 2  # Squared distance between antennas
+    return int(antinode_bitmap.sum()), ["".join(row) for row in modified_grid]
 
-    return dist_sq_1 == dist_sq_between or dist_sq_2 == dist_sq_between
-
-def is_antinode_from_trio(r1: int, c1: int, r2: int, c2: int, r3: int, c3: int) -> bool:
+def find_pair_antinodes(locations: List[Tuple[int, int]], rows: int, cols: int):
     """
-    Checks if an antenna at (r3, c3) is an antinode formed by three antennas.
-    It is an antinode if it's collinear with the other two and one of the other
-    antennas is twice as far from it as the remaining antenna.
+    Computes the antinodes of every pair of antennas of one frequency with
+    NumPy: for each pair (a, b), the two points 2a - b and 2b - a, where one
+    antenna is twice as far away as the other. All pairs are built with one
+    index combination and evaluated in a single broadcast.
 
     Args:
-        r1, c1: Coordinates of the first antenna.
-        r2, c2: Coordinates of the second antenna.
-        r3, c3: Coordinates of the third antenna (potential antinode).
+        locations: Antenna positions (row, col) of a single frequency.
+        rows, cols: Grid dimensions.
 
     Returns:
-        True if (r3, c3) is an antinode formed by the trio, False otherwise.
+        A NumPy array of flat indices (row * cols + col) of the antinodes inside
+        the grid; an index may appear more than once.
     """
-
-    # Squared distances between antennas
-    dist_sq_12 = (r1 - r2) ** 2 + (c1 - c2) ** 2
-    dist_sq_13 = (r1 - r3) ** 2 + (c1 - c3) ** 2
-    dist_sq_23 = (r2 - r3) ** 2 + (c2 - c3) ** 2
-
-    # Check collinearity and distance conditions
-    # The third antenna (r3, c3) can be an antinode if:
-    # 1. The distance between (r1, c1) and (r3, c3) is 4 times the distance between (r1, c1) and (r2, c2)
-    # 2. The distance between (r1, c1) and (r3, c3) is 1/4 the distance between (r1, c1) and (r2, c2)
-    # 3. The distance between (r2, c2) and (r3, c3) is 4 times the distance between (r1, c1) and (r2, c2)
-    # 4. The distance between (r2, c2) and (r3, c3) is 1/4 the distance between (r1, c1) and (r2, c2)
-
-    return (
-        4 * dist_sq_13 == dist_sq_12
-        or dist_sq_13 == 4 * dist_sq_12
-        or 4 * dist_sq_23 == dist_sq_12
-        or dist_sq_23 == 4 * dist_sq_12
+    points = np.array(locations, dtype=np.int64).reshape(-1, 2)
+    first, second = np.triu_indices(len(points), k=1)
+    a, b = points[first], points[second]
+
+    candidates = np.concatenate((2 * a - b, 2 * b - a))
+    in_bounds = (
+        (candidates[:, 0] >= 0) & (candidates[:, 0] < rows)
+        & (candidates[:, 1] >= 0) & (candidates[:, 1] < cols)
     )
+    inside = candidates[in_bounds]
+    return inside[:, 0] * cols + inside[:, 1]
 
 def mark_antinode(grid: List[List[str]], row: int, col: int):
     """Marks an antinode on the grid if the cell is empty."""
@@ -147,7 +93,7 @@ def calculate_antinodes_with_harmonics(grid: List[str]) -> Tuple[int, List[str]]
     rows = len(grid)
     cols = len(grid[0])
     antenna_locations = defaultdict(list)  # {frequency: [(row, col), ...]}
-    antinode_locations = set()  # {(row, col), ...}
+    antinode_bitmap = bytearray(rows * cols)  # 1 at row * cols + col for each antinode
 
     # 1. Record antenna locations for each frequency
     for row_index, row in enumerate(grid):
@@ -155,108 +101,156 @@ def calculate_antinodes_with_harmonics(grid: List[str]) -> Tuple[int, List[str]]
             if cell != '.':
                 antenna_locations[cell].append((row_index, col_index))
 
-    modified_grid = [list(row) for row in grid]  # Copy grid to mark antinodes
-
-    # 2. Process each frequency to find antinodes
-    for frequency, locations in antenna_locations.items():
-        num_antennas = len(locations)
-
-        # If only one antenna of this frequency, it can't be an antinode
-        if num_antennas < 2:
-            continue
-
-        # Mark all antennas of this frequency as antinodes
-        for r, c in locations:
-            antinode_locations.add((r, c))
-            mark_antinode(modified_grid, r, c)
-        
-        # 3. Find all points collinear with at least two antennas
-        for i in range(num_antennas):
-            for j in range(i + 1, num_antennas):
-                r1, c1 = locations[i]
-                r2, c2 = locations[j]
-
-                # Iterate through all points on the grid
-                for r in range(rows):
-                    for c in range(cols):
-                        # Skip the antenna locations themselves
-                        if (r, c) == (r1, c1) or (r, c) == (r2, c2):
-                            continue
-
-                        # Check for collinearity using cross-product formula
-                        if is_collinear(r1, c1, r2, c2, r, c):
-                            antinode_locations.add((r, c))
-                            mark_antinode(modified_grid, r, c)
-    
-    
+    # 2. Walk the line through each pair of antennas of the same frequency
     for frequency, locations in antenna_locations.items():
         for i in range(len(locations)):
             for j in range(i + 1, len(locations)):
                 r1, c1 = locations[i]
                 r2, c2 = locations[j]
+                for index in harmonic_line_cells(rows, cols, r1, c1, r2 - r1, c2 - c1):
+                    antinode_bitmap[index] = 1
+
+    # 3. Mark antinodes on a copy of the grid, leaving antennas visible
+    modified_grid = [list(row) for row in grid]
+    for index, is_antinode in enumerate(antinode_bitmap):
+        if is_antinode:
+            mark_antinode(modified_grid, index // cols, index % cols)
+
+    return sum(antinode_bitmap), ["".join(row) for row in modified_grid]
 
-                # Calculate the step for traversing the line
-                row_step = r2 - r1
-                col_step = c2 - c1
-
-                # Ensure that we don't divide by zero
-                if row_step == 0 and col_step == 0:
-                    continue
-
-                # Find the greatest common divisor (GCD) to simplify the step
-                def gcd(a, b):
-                    while b:
-                        a, b = b, a % b
-                    return a
-
-                divisor = gcd(row_step, col_step)
-                row_step //= divisor
-                col_step //= divisor
-                
-                # Start from the first antenna and move along the line
-                r, c = r1 + row_step, c1 + col_step
-
-                # Continue until we are within grid boundaries
-                while 0 <= r < rows and 0 <= c < cols:
-                    # If this point is not already marked as an antinode, mark it
-                    if (r,c) != (r1,c1) and (r,c) != (r2, c2) and is_collinear(r1,c1, r2, c2, r, c):
-                        antinode_locations.add((r, c))
-                        mark_antinode(modified_grid, r, c)
-
-                    # Move to the next point on the line
-                    r += row_step
-                    c += col_step
-
-                # Start from the first antenna and move along the line in the opposite direction
-                r, c = r1 - row_step, c1 - col_step
-
-                # Continue until we are within grid boundaries
-                while 0 <= r < rows and 0 <= c < cols:
-                    # If this point is not already marked as an antinode, mark it
-                    if (r,c) != (r1,c1) and (r,c) != (r2, c2) and is_collinear(r1,c1, r2, c2, r, c):
-                        antinode_locations.add((r, c))
-                        mark_antinode(modified_grid, r, c)
-                    
-                    # Move to the next point on the line
-                    r -= row_step
-                    c -= col_step
-
-    return len(antinode_locations), ["".join(row) for row in modified_grid]
-
-def is_collinear(r1: int, c1: int, r2: int, c2: int, r: int, c: int) -> bool:
+def harmonic_line_cells(rows: int, cols: int, r: int, c: int, row_diff: int, col_diff: int) -> Iterator[int]:
     """
-    Checks if a point (r, c) is collinear with two other points (r1, c1) and (r2, c2)
-    using the cross-product formula.
+    Yields the flat index (row * cols + col) of every grid position on the line
+    through (r, c) with direction (row_diff, col_diff), walking outward in both
+    directions. The direction is reduced by its greatest common divisor first,
+    so that every integer point on the line is visited, and nothing else.
 
     Args:
-        r1, c1: Coordinates of the first point.
-        r2, c2: Coordinates of the second point.
-        r, c:   Coordinates of the point to check for collinearity.
+        rows, cols: Grid dimensions.
+        r, c: A point on the line (one of the antennas).
+        row_diff, col_diff: Offset to the other antenna; must not be (0, 0).
 
-    Returns:
-        True if the point is collinear, False otherwise.
+    Yields:
+        Flat indices of the positions on the line, each once.
+    """
+    divisor = gcd(row_diff, col_diff)
+    row_step, col_step = row_diff // divisor, col_diff // divisor
+
+    # Forward from (r, c), including it
+    row, col = r, c
+    while 0 <= row < rows and 0 <= col < cols:
+        yield row * cols + col
+        row += row_step
+        col += col_step
+
+    # Backward from the point just before (r, c)
+    row, col = r - row_step, c - col_step
+    while 0 <= row < rows and 0 <= col < cols:
+        yield row * cols + col
+        row -= row_step
+        col -= col_step
+
+class AntennaIndex:
+    """
+    An antenna map parsed once, which keeps its antinodes up to date as
+    antennas are added or removed.
+
+    For every cell, the index counts how many antenna pairs produce an
+    antinode there, so adding or removing an antenna only revisits the pairs
+    it belongs to, and the number of unique antinodes (cells with a non-zero
+    count) is always available in O(1). The marked grid is rendered only when
+    asked for.
+
+    Args:
+        grid: A list of strings representing the antenna map.
+        harmonics: If True, use Part 2 rules (every point in line with a pair);
+                   otherwise Part 1 rules (the two points at twice the distance).
     """
-    return (c2 - c1) * (r - r1) == (c - c1) * (r2 - r1)
+
+    def __init__(self, grid: List[str], harmonics: bool = False):
+        self.rows = len(grid)
+        self.cols = len(grid[0])
+        self.harmonics = harmonics
+        self.antennas: Dict[Tuple[int, int], str] = {}  # {(row, col): frequency}
+        self.antenna_locations = defaultdict(list)  # {frequency: [(row, col), ...]}
+        self.pair_counts = [0] * (self.rows * self.cols)  # Pairs producing an antinode, by flat index
+        self.antinode_count = 0  # Cells with a non-zero pair count
+
+        for row_index, row in enumerate(grid):
+            for col_index, cell in enumerate(row):
+                if cell != '.':
+                    self.add_antenna(cell, row_index, col_index)
+
+    def pair_cells(self, first: Tuple[int, int], second: Tuple[int, int]) -> List[int]:
+        """
+        Returns the flat indices of the antinodes produced by one pair of antennas.
+        """
+        (r1, c1), (r2, c2) = first, second
+        if self.harmonics:
+            return list(harmonic_line_cells(self.rows, self.cols, r1, c1, r2 - r1, c2 - c1))
+
+        cells = []
+        for antinode_r, antinode_c in [(2 * r1 - r2, 2 * c1 - c2), (2 * r2 - r1, 2 * c2 - c1)]:
+            if 0 <= antinode_r < self.rows and 0 <= antinode_c < self.cols:
+                cells.append(antinode_r * self.cols + antinode_c)
+        return cells
+
+    def _update_pairs(self, location: Tuple[int, int], frequency: str, delta: int):
+        # Add delta to the counts of every pair between `location` and the other antennas
+        for other in self.antenna_locations[frequency]:
+            if other == location:
+                continue
+            for index in self.pair_cells(location, other):
+                count = self.pair_counts[index]
+                self.pair_counts[index] = count + delta
+                if count == 0:
+                    self.antinode_count += 1
+                elif count + delta == 0:
+                    self.antinode_count -= 1
+
+    def add_antenna(self, frequency: str, row: int, col: int):
+        """
+        Places an antenna and counts the antinodes of its new pairs.
+
+        Raises:
+            ValueError: If the position is outside the grid or already has an antenna.
+        """
+        location = (row, col)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise ValueError(f"Position {location} is outside the grid")
+        if location in self.antennas:
+            raise ValueError(f"Position {location} already has an antenna")
+
+        self._update_pairs(location, frequency, 1)
+        self.antennas[location] = frequency
+        self.antenna_locations[frequency].append(location)
+
+    def remove_antenna(self, row: int, col: int):
+        """
+        Removes an antenna and uncounts the antinodes of its pairs.
+
+        Raises:
+            ValueError: If there is no antenna at the position.
+        """
+        location = (row, col)
+        if location not in self.antennas:
+            raise ValueError(f"No antenna at position {location}")
+
+        frequency = self.antennas.pop(location)
+        self._update_pairs(location, frequency, -1)
+        self.antenna_locations[frequency].remove(location)
+
+    def render(self) -> List[str]:
+        """
+        Renders the current map with antinodes marked by '#' on empty cells.
+        """
+        modified_grid = [['.'] * self.cols for _ in range(self.rows)]
+        for (row, col), frequency in self.antennas.items():
+            modified_grid[row][col] = frequency
+        for index, count in enumerate(self.pair_counts):
+            if count:
+                mark_antinode(modified_grid, index // self.cols, index % self.cols)
+        return ["".join(row) for row in modified_grid]
 
 def solve_test_cases():
     """
@@ -346,6 +340,20 @@ def solve_test_cases():
         #     print(row)
         # print("-" * 20)
         assert num_antinodes_part2 == expected
+
+        # The incremental index must agree under both rules, before and after an antenna is moved away and back
+        for harmonics, calculate in [(False, calculate_antinodes), (True, calculate_antinodes_with_harmonics)]:
+            index = AntennaIndex(grid, harmonics=harmonics)
+            expected_result = calculate(grid)
+            assert (index.antinode_count, index.render()) == expected_result
+            (row, col), frequency = next(iter(index.antennas.items()))
+            index.remove_antenna(row, col)
+            remaining = [['.'] * index.cols for _ in range(index.rows)]
+            for (antenna_row, antenna_col), antenna_frequency in index.antennas.items():
+                remaining[antenna_row][antenna_col] = antenna_frequency
+            assert (index.antinode_count, index.render()) == calculate(["".join(row) for row in remaining])
+            index.add_antenna(frequency, row, col)
+            assert (index.antinode_count, index.render()) == expected_result
     print("All test cases passed!")
 
 